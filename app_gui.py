@@ -11,17 +11,20 @@ from datetime import datetime
 import queue
 import shutil
 import tempfile
+import uuid
 import re
 import subprocess
 import psutil
 import logging
+import traceback
 import random
-from openpyxl.utils import get_column_letter
+from collections import Counter
+from pathlib import Path
 
 # 기존 분석기 및 비디오 프로세서 임포트
 from video_processor import VideoProcessor
-from image_analyzer import GoogleVisionAnalyzer
-from main import is_valid_format, check_api_keys, validate_frame_times, is_valid_video_file, clear_directory
+from image_analyzer import GoogleVisionAnalyzer, clear_result_cache
+from main import is_valid_format, check_api_keys, validate_frame_times, is_valid_video_file, clear_directory, remove_tree
 
 # 로깅 설정
 logging.basicConfig(
@@ -31,32 +34,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 처리 대상 파일 확장자
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.wmv', '.mkv', '.flv')
+# 삭제 대기 중인 output 폴더 이름 표시 (output.trash.<pid>.<고유값>)
+TRASH_DIR_MARKER = '.trash.'
+
 # 파일 유효성 검사 함수
+def has_extension(file_name, valid_extensions):
+    """파일명 확장자 검사 (파일 시스템 접근 없음)"""
+    _, ext = os.path.splitext(file_name)
+    return ext.lower() in valid_extensions
+
 def is_valid_file(file_path, valid_extensions):
     """파일 유효성 검사 (확장자 기준)"""
     if not file_path or not os.path.isfile(file_path):
         return False
-    _, ext = os.path.splitext(file_path)
-    return ext.lower() in valid_extensions
+    return has_extension(file_path, valid_extensions)
 
 def is_valid_image_file(file_path):
     """이미지 파일 유효성 검사"""
-    valid_exts = ['.jpg', '.jpeg', '.png', '.gif', '.bmp']
-    return is_valid_file(file_path, valid_exts)
+    return is_valid_file(file_path, IMAGE_EXTENSIONS)
     
 def is_valid_video_file(file_path):
     """비디오 파일 유효성 검사"""
-    valid_exts = ['.mp4', '.avi', '.mov', '.wmv', '.mkv', '.flv']
-    return is_valid_file(file_path, valid_exts)
+    return is_valid_file(file_path, VIDEO_EXTENSIONS)
+
+def scan_files(folder):
+    """폴더 내 파일 목록을 DirEntry로 반환 (하위 폴더 제외, 파일별 추가 stat 없음)"""
+    with os.scandir(folder) as entries:
+        return [entry for entry in entries if entry.is_file()]
+
+def is_name_conflict(src_path, dst_path):
+    """대상 경로에 원본과 다른 파일이 이미 존재하는지 확인 (대상이 없으면 충돌 아님)"""
+    try:
+        return not Path(src_path).samefile(dst_path)
+    except FileNotFoundError:
+        return False
 
 class RedirectText:
     """콘솔 출력을 GUI로 리다이렉트하는 클래스"""
-    def __init__(self, text_widget, max_messages=1000):
+    def __init__(self, text_widget, max_messages=1000, max_batch_size=256):
         self.text_widget = text_widget
-        self.queue = queue.Queue()
+        self.queue = queue.SimpleQueue()  # 작업 스레드에서는 큐에 넣기만 함 (Tk 호출 없음)
         self.update_timer = None
         self.last_message = ""  # 마지막으로 출력된 메시지 저장
         self.max_messages = max_messages  # 최대 메시지 수 (메모리 관리)
+        self.max_batch_size = max_batch_size  # 한 번의 업데이트에서 처리할 최대 메시지 수
         self.message_count = 0
         
         # 텍스트 태그 설정
@@ -71,6 +95,9 @@ class RedirectText:
         self.text_widget.tag_configure("error_keyword", foreground="red", font=("Malgun Gothic", 10, "bold"))
         self.text_widget.tag_configure("warning_keyword", foreground="orange", font=("Malgun Gothic", 10, "bold"))
 
+        # 메인 스레드에서 주기적으로 큐를 비우는 타이머 시작
+        self.update_timer = self.text_widget.after(100, self.update_text)
+
     def write(self, string):
         # 빈 문자열이면 무시
         if not string:
@@ -86,18 +113,6 @@ class RedirectText:
             
         self.last_message = string.strip()
         self.queue.put(string)
-        
-        # 처음 호출되는 경우에만 타이머 시작
-        if self.update_timer is None:
-            # 로그 업데이트 간격을 100ms에서 20ms로 줄여 더 빠른 응답성 제공
-            self.update_timer = self.text_widget.after(20, self.update_text)
-        
-        # 중요 로그 패턴 감지 시 즉시 업데이트 시도
-        if string.startswith("✓") or string.startswith("❌") or string.startswith("⚠️") or "[" in string:
-            # 이미 타이머가 설정된 경우 취소하고 즉시 업데이트
-            if self.update_timer:
-                self.text_widget.after_cancel(self.update_timer)
-                self.update_timer = self.text_widget.after(1, self.update_text)
     
     def _should_filter_message(self, message):
         """필터링할 메시지인지 확인"""
@@ -136,123 +151,78 @@ class RedirectText:
             return None
 
     def update_text(self):
-        """큐에 있는 메시지를 텍스트 위젯에 업데이트"""
+        """큐에 쌓인 메시지를 모아서 한 번에 텍스트 위젯에 업데이트 (메인 스레드에서 실행)"""
         self.update_timer = None
         
         try:
-            # 한 번의 업데이트에서 최대 처리할 메시지 수 제한
-            messages_processed = 0
-            max_batch_size = 10  # 한 번에 최대 10개 메시지 처리
+            # 한 번의 업데이트에서 최대 max_batch_size개 메시지 수집
+            batch = []
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
             
-            while not self.queue.empty() and messages_processed < max_batch_size:
-                string = self.queue.get_nowait()
-                self.text_widget.configure(state='normal')
+            if batch:
+                # 메시지와 태그를 번갈아 나열하여 한 번의 insert 호출로 삽입
+                insert_args = []
+                for string in batch:
+                    insert_args.append(string)
+                    insert_args.append(self._get_tag_for_message(string) or ())
                 
-                # 메시지 유형에 따른 태그 결정
-                tag = self._get_tag_for_message(string)
-                
-                # 텍스트 위젯에 메시지 추가 (태그 적용)
-                if tag:
-                    # 메시지 전체 삽입
-                    self.text_widget.insert(tk.END, string, tag)
-                    
-                    # 성공, 실패, 오류 등의 키워드에 대한 강조 처리
-                    self._highlight_keywords(string)
-                else:
-                    # 일반 메시지 삽입
-                    self.text_widget.insert(tk.END, string)
-                    
-                    # 키워드 강조 처리
-                    self._highlight_keywords(string)
+                self.text_widget.configure(state='normal')
+                start_index = self.text_widget.index(tk.END + "-1c linestart")
+                self.text_widget.insert(tk.END, *insert_args)
                 
-                self.message_count += 1
-                messages_processed += 1
+                # 성공, 실패, 오류 등의 키워드에 대한 강조 처리
+                self._highlight_keywords(start_index)
                 
                 # 최대 메시지 수를 초과하면 오래된 메시지 제거 (메모리 관리)
+                self.message_count += len(batch)
                 if self.message_count > self.max_messages:
-                    self.text_widget.delete(1.0, 2.0)
-                    self.message_count -= 1
+                    excess = self.message_count - self.max_messages
+                    self.text_widget.delete(1.0, f"{excess + 1}.0")
+                    self.message_count = self.max_messages
                 
                 # 스크롤을 최신 메시지로 이동
                 self.text_widget.see(tk.END)
                 self.text_widget.configure(state='disabled')
-                self.queue.task_done()
-                
-            # 메시지 처리 후 강제 업데이트
-            self.text_widget.update_idletasks()
             
-            # 큐에 메시지가 더 있거나 배치 처리가 완료된 경우 다시 타이머 설정
-            if not self.queue.empty() or messages_processed >= max_batch_size:
-                # 즉시 다음 배치 처리 예약
-                self.update_timer = self.text_widget.after(10, self.update_text)
-            else:
-                # 큐가 비어있으면 약간 더 길게 대기 후 다시 확인
-                self.update_timer = self.text_widget.after(50, self.update_text)
+            # 큐에 메시지가 더 남아 있으면 바로 다음 배치 처리, 아니면 잠시 대기
+            delay = 10 if not self.queue.empty() else 100
+            self.update_timer = self.text_widget.after(delay, self.update_text)
                 
-        except queue.Empty:
-            # 큐가 비어있으면 일정 시간 후 다시 확인
-            self.update_timer = self.text_widget.after(50, self.update_text)
         except Exception as e:
             # 예외 발생 시 복구 시도
             print(f"로그 업데이트 중 오류: {str(e)}")
             self.update_timer = self.text_widget.after(100, self.update_text)
     
-    def _highlight_keywords(self, message):
-        """메시지 내의 성공, 실패, 오류 등의 키워드 강조 처리"""
-        # 현재 위치 (마지막에 삽입된 텍스트)
-        current_line = self.text_widget.index(tk.END + "-1c linestart")
-        
-        # 성공 관련 키워드 강조
-        success_keywords = ["성공", "[성공]", "완료", "처리 완료"]
-        for keyword in success_keywords:
-            start_idx = 0
-            while True:
-                start_pos = self.text_widget.search(keyword, current_line + f"+{start_idx}c", tk.END)
-                if not start_pos:
-                    break
-                end_pos = f"{start_pos}+{len(keyword)}c"
-                self.text_widget.tag_add("success_keyword", start_pos, end_pos)
-                # 다음 검색을 위해 인덱스 업데이트
-                start_idx_parts = start_pos.split('.')
-                if len(start_idx_parts) > 1:
-                    start_idx = int(start_idx_parts[1]) + len(keyword)
-        
-        # 오류 관련 키워드 강조
-        error_keywords = ["실패", "[실패]", "오류", "에러", "Error", "error"]
-        for keyword in error_keywords:
-            start_idx = 0
-            while True:
-                start_pos = self.text_widget.search(keyword, current_line + f"+{start_idx}c", tk.END)
-                if not start_pos:
-                    break
-                end_pos = f"{start_pos}+{len(keyword)}c"
-                self.text_widget.tag_add("error_keyword", start_pos, end_pos)
-                # 다음 검색을 위해 인덱스 업데이트
-                start_idx_parts = start_pos.split('.')
-                if len(start_idx_parts) > 1:
-                    start_idx = int(start_idx_parts[1]) + len(keyword)
+    def _highlight_keywords(self, start_index):
+        """start_index 이후에 삽입된 텍스트의 성공, 실패, 오류 등의 키워드 강조 처리"""
+        keyword_tags = [
+            # 성공 관련 키워드 강조
+            ("success_keyword", ["성공", "[성공]", "완료", "처리 완료"]),
+            # 오류 관련 키워드 강조
+            ("error_keyword", ["실패", "[실패]", "오류", "에러", "Error", "error"]),
+            # 경고 관련 키워드 강조
+            ("warning_keyword", ["건너뜀", "[건너뜀]", "경고", "주의"]),
+        ]
         
-        # 경고 관련 키워드 강조
-        warning_keywords = ["건너뜀", "[건너뜀]", "경고", "주의"]
-        for keyword in warning_keywords:
-            start_idx = 0
-            while True:
-                start_pos = self.text_widget.search(keyword, current_line + f"+{start_idx}c", tk.END)
-                if not start_pos:
-                    break
-                end_pos = f"{start_pos}+{len(keyword)}c"
-                self.text_widget.tag_add("warning_keyword", start_pos, end_pos)
-                # 다음 검색을 위해 인덱스 업데이트
-                start_idx_parts = start_pos.split('.')
-                if len(start_idx_parts) > 1:
-                    start_idx = int(start_idx_parts[1]) + len(keyword)
+        for tag, keywords in keyword_tags:
+            for keyword in keywords:
+                search_pos = start_index
+                while True:
+                    start_pos = self.text_widget.search(keyword, search_pos, tk.END)
+                    if not start_pos:
+                        break
+                    end_pos = f"{start_pos}+{len(keyword)}c"
+                    self.text_widget.tag_add(tag, start_pos, end_pos)
+                    # 다음 검색은 찾은 키워드 다음 위치부터
+                    search_pos = end_pos
     
     def flush(self):
-        """파이썬 출력 스트림 호환을 위한 메서드"""
-        # 큐에 있는 모든 메시지 즉시 처리 시도
-        if self.update_timer:
-            self.text_widget.after_cancel(self.update_timer)
-            self.update_timer = self.text_widget.after(1, self.update_text)
+        """파이썬 출력 스트림 호환을 위한 메서드 (메시지는 메인 스레드 타이머가 주기적으로 처리)"""
+        pass
         
     def clear(self):
         """텍스트 위젯의 내용을 지움"""
@@ -342,6 +312,21 @@ class FileRenamerXApp:
         
         self.path_label = ttk.Label(self.folder_button_frame, text="./작업폴더")
         self.path_label.pack(side=tk.LEFT, padx=5)
+        
+        # 저장된 분석 결과 삭제 (잘못된 결과를 다시 분석하고 싶을 때)
+        ttk.Button(
+            self.folder_button_frame,
+            text="분석 캐시 비우기",
+            command=self.clear_analysis_cache
+        ).pack(side=tk.RIGHT, padx=5)
+
+    def clear_analysis_cache(self):
+        """저장된 분석 결과 캐시 삭제"""
+        if self.is_running:
+            messagebox.showwarning("알림", "작업이 진행 중일 때는 캐시를 비울 수 없습니다.")
+            return
+        clear_result_cache()
+        print("✓ 분석 결과 캐시를 삭제했습니다. 다음 작업에서 모든 프레임을 새로 분석합니다.")
 
     def create_button_frame(self, parent):
         """버튼 프레임 생성"""
@@ -436,13 +421,11 @@ class FileRenamerXApp:
         
         # 폴더 내 파일 검색
         try:
-            for filename in os.listdir(folder):
-                file_path = os.path.join(folder, filename)
-                if os.path.isfile(file_path):
-                    if is_valid_video_file(file_path):
-                        video_files.append(file_path)
-                    elif is_valid_image_file(file_path):
-                        image_files.append(file_path)
+            for entry in scan_files(folder):
+                if has_extension(entry.name, VIDEO_EXTENSIONS):
+                    video_files.append(entry)
+                elif has_extension(entry.name, IMAGE_EXTENSIONS):
+                    image_files.append(entry)
         except PermissionError:
             print(f"❌ 폴더 접근 권한이 없습니다: {folder}")
             return
@@ -457,12 +440,11 @@ class FileRenamerXApp:
             print(f"- 이미지 파일: {len(image_files)}개")
             print("")
             
-            # 최근 수정된 순으로 정렬하여 표시
-            all_files = sorted(video_files + image_files, key=lambda x: os.path.getmtime(x), reverse=True)
-            for i, file_path in enumerate(all_files, 1):
-                filename = os.path.basename(file_path)
-                file_type = "비디오" if is_valid_video_file(file_path) else "이미지"
-                print(f"{i}. [{file_type}] {filename}")
+            # 최근 수정된 순으로 정렬하여 표시 (scandir 항목의 stat 정보 사용)
+            all_files = sorted(video_files + image_files, key=lambda entry: entry.stat().st_mtime, reverse=True)
+            for i, entry in enumerate(all_files, 1):
+                file_type = "비디오" if has_extension(entry.name, VIDEO_EXTENSIONS) else "이미지"
+                print(f"{i}. [{file_type}] {entry.name}")
         else:
             print("처리할 파일이 없습니다.")
     
@@ -480,10 +462,9 @@ class FileRenamerXApp:
         
         # 폴더 내 이미지 파일 검색
         try:
-            for filename in os.listdir(folder):
-                file_path = os.path.join(folder, filename)
-                if os.path.isfile(file_path) and is_valid_image_file(file_path):
-                    image_files.append(file_path)
+            for entry in scan_files(folder):
+                if has_extension(entry.name, IMAGE_EXTENSIONS):
+                    image_files.append(entry)
         except PermissionError:
             print(f"❌ 폴더 접근 권한이 없습니다: {folder}")
             return
@@ -495,11 +476,10 @@ class FileRenamerXApp:
             # 이미지 파일 개수 출력
             print(f"이미지 파일 목록 (총 {len(image_files)}개):")
             
-            # 최근 수정된 순으로 정렬하여 표시
-            sorted_files = sorted(image_files, key=lambda x: os.path.getmtime(x), reverse=True)
-            for i, file_path in enumerate(sorted_files, 1):
-                filename = os.path.basename(file_path)
-                print(f"{i}. {filename}")
+            # 최근 수정된 순으로 정렬하여 표시 (scandir 항목의 stat 정보 사용)
+            sorted_files = sorted(image_files, key=lambda entry: entry.stat().st_mtime, reverse=True)
+            for i, entry in enumerate(sorted_files, 1):
+                print(f"{i}. {entry.name}")
         else:
             print("처리할 이미지 파일이 없습니다.")
 
@@ -517,10 +497,9 @@ class FileRenamerXApp:
         
         # 폴더 내 동영상 파일 검색
         try:
-            for filename in os.listdir(folder):
-                file_path = os.path.join(folder, filename)
-                if os.path.isfile(file_path) and is_valid_video_file(file_path):
-                    video_files.append(file_path)
+            for entry in scan_files(folder):
+                if has_extension(entry.name, VIDEO_EXTENSIONS):
+                    video_files.append(entry)
         except PermissionError:
             print(f"❌ 폴더 접근 권한이 없습니다: {folder}")
             return
@@ -532,11 +511,10 @@ class FileRenamerXApp:
             # 동영상 파일 개수 출력
             print(f"동영상 파일 목록 (총 {len(video_files)}개):")
             
-            # 최근 수정된 순으로 정렬하여 표시
-            sorted_files = sorted(video_files, key=lambda x: os.path.getmtime(x), reverse=True)
-            for i, file_path in enumerate(sorted_files, 1):
-                filename = os.path.basename(file_path)
-                print(f"{i}. {filename}")
+            # 최근 수정된 순으로 정렬하여 표시 (scandir 항목의 stat 정보 사용)
+            sorted_files = sorted(video_files, key=lambda entry: entry.stat().st_mtime, reverse=True)
+            for i, entry in enumerate(sorted_files, 1):
+                print(f"{i}. {entry.name}")
         else:
             print("처리할 동영상 파일이 없습니다.")
 
@@ -567,18 +545,20 @@ class FileRenamerXApp:
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             print(f"\n[{current_time}] 작업 시작")
             
+            # 이전 실행에서 삭제하지 못하고 남은 output 임시 폴더 정리
+            self.remove_stale_trash_dirs(work_dir)
+            
             # 파일명 변경 모드
             if True:  # 항상 파일명 변경 모드
                 # 작업 폴더 내 파일 확인
                 if not self.selected_files:
                     # 폴더 내 모든 비디오/이미지 파일 확인
-                    all_files = []
-                    for f in os.listdir(work_dir):
-                        file_path = os.path.join(work_dir, f)
-                        if os.path.isfile(file_path) and (is_valid_video_file(file_path) or is_valid_image_file(file_path)):
-                            all_files.append(file_path)
+                    has_target_file = any(
+                        has_extension(entry.name, VIDEO_EXTENSIONS + IMAGE_EXTENSIONS)
+                        for entry in scan_files(work_dir)
+                    )
                             
-                    if not all_files:
+                    if not has_target_file:
                         messagebox.showerror("오류", "작업 폴더에 처리할 비디오/이미지 파일이 없습니다.")
                         return
                 
@@ -690,11 +670,13 @@ class FileRenamerXApp:
                 self.finish_process()
                 return
             
-            # 비디오/이미지 파일 개수 카운트
-            video_count = sum(1 for _, path in all_files if is_valid_video_file(path))
-            image_count = sum(1 for _, path in all_files if is_valid_image_file(path))
+            # 비디오/이미지 파일 분류 (목록 생성 시 이미 검증되었으므로 확장자로 한 번만 판단)
+            total_files = len(all_files)
+            video_flags = [has_extension(path, VIDEO_EXTENSIONS) for _, path in all_files]
+            video_count = sum(video_flags)
+            image_count = total_files - video_count
             
-            print(f"✓ 총 {len(all_files)}개 파일을 처리합니다:")
+            print(f"✓ 총 {total_files}개 파일을 처리합니다:")
             print(f"  • 비디오: {video_count}개")
             print(f"  • 이미지: {image_count}개")
             print("✓ 파일명 변경 작업을 시작합니다...")
@@ -710,24 +692,23 @@ class FileRenamerXApp:
             image_counter = 0
             
             # 각 파일 처리
-            for idx, (file_rel_path, file_full_path) in enumerate(all_files, 1):
+            for idx, ((file_rel_path, file_full_path), is_video) in enumerate(zip(all_files, video_flags), 1):
                 if not self.running:
                     break
                 
                 # 진행률 계산 및 표시
-                progress_pct = int(idx / len(all_files) * 100)
-                self.status_bar.config(text=f"처리 중... {progress_pct}% ({idx}/{len(all_files)})")
+                progress_pct = int(idx / total_files * 100)
+                self.status_bar.config(text=f"처리 중... {progress_pct}% ({idx}/{total_files})")
                 
                 # 원본 파일명 저장
                 original_filename = os.path.basename(file_full_path)
-                is_video = is_valid_video_file(file_full_path)
-                is_image = is_valid_image_file(file_full_path)
+                is_image = not is_video
                 
                 # 파일 유형에 따라 처리
                 if is_video:
                     # 비디오 파일 처리
                     result = self.process_video_file(
-                        idx, len(all_files), file_rel_path, file_full_path, original_filename,
+                        idx, total_files, file_rel_path, file_full_path, original_filename,
                         video_processor, analyzer, frame_times, 
                         file_changes, total_processed, video_processed,
                         last_video_name, last_video_base_name, image_counter
@@ -744,7 +725,7 @@ class FileRenamerXApp:
                 elif is_image and last_video_name:
                     # 이미지 파일 처리 (직전 동영상 파일명 기준으로 변경)
                     result = self.process_image_file(
-                        idx, len(all_files), file_full_path, original_filename,
+                        idx, total_files, file_full_path, original_filename,
                         last_video_base_name, image_counter
                     )
                     
@@ -755,13 +736,13 @@ class FileRenamerXApp:
                         image_counter = result.get('image_counter')
                         
                 elif is_image:
-                    print(f"\n[{idx}/{len(all_files)}] [이미지] {original_filename}")
+                    print(f"\n[{idx}/{total_files}] [이미지] {original_filename}")
                     print(f"⚠️ 이전 비디오 파일이 없어 이름을 변경하지 않습니다.")
             
             if self.running:  # 정상 종료인 경우에만 완료 메시지 출력
                 # 작업 결과 요약
                 print("\n[ 작업 결과 요약 ]")
-                print(f"• 총 파일: {len(all_files)}개")
+                print(f"• 총 파일: {total_files}개")
                 print(f"• 처리 완료: {total_processed}개")
                 print(f"• 비디오: {video_processed}개")
                 print(f"• 이미지: {image_processed}개")
@@ -769,12 +750,10 @@ class FileRenamerXApp:
                 # 변경된 파일 목록 출력
                 if file_changes:
                     print("\n✓ 변경된 파일:")
-                    for i, (orig, new) in enumerate(file_changes, 1):
-                        print(f"  {i}. {orig} → {new}")
+                    print("\n".join(f"  {i}. {orig} → {new}" for i, (orig, new) in enumerate(file_changes, 1)))
                 
         except Exception as e:
             print(f"\n❌ 오류 발생: {str(e)}")
-            import traceback
             print(traceback.format_exc())  # 디버깅을 위한 스택 트레이스 출력
         finally:
             self.finish_process()
@@ -782,6 +761,7 @@ class FileRenamerXApp:
     def get_target_files(self, work_dir):
         """처리 대상 파일 목록 가져오기"""
         all_files = []
+        mtimes = {}  # 폴더 검색 시 얻은 수정 시간 (정렬 시 재사용)
         
         if self.selected_files:
             # 선택한 파일 목록 사용
@@ -804,15 +784,18 @@ class FileRenamerXApp:
         else:
             # 폴더 내 모든 파일 사용 (하위 폴더 제외)
             try:
-                for f in os.listdir(work_dir):
-                    file_path = os.path.join(work_dir, f)
-                    if os.path.isfile(file_path) and (is_valid_video_file(file_path) or is_valid_image_file(file_path)):
-                        all_files.append((f, file_path))
+                for entry in scan_files(work_dir):
+                    if has_extension(entry.name, VIDEO_EXTENSIONS + IMAGE_EXTENSIONS):
+                        all_files.append((entry.name, entry.path))
+                        mtimes[entry.path] = entry.stat().st_mtime
             except Exception as e:
                 print(f"❌ 폴더 읽기 오류: {str(e)}")
         
         # 파일 수정 날짜 기준 내림차순 정렬
-        all_files.sort(key=lambda x: os.path.getmtime(x[1]), reverse=True)
+        all_files.sort(
+            key=lambda x: mtimes[x[1]] if x[1] in mtimes else os.path.getmtime(x[1]),
+            reverse=True
+        )
         return all_files
     
     def process_video_file(self, idx, total, file_rel_path, file_full_path, original_filename,
@@ -855,7 +838,7 @@ class FileRenamerXApp:
                     new_path = os.path.join(dir_path, f"{new_name}{ext}")
                     
                     # 이미 같은 이름의 파일이 있는지 확인
-                    if os.path.exists(new_path) and os.path.abspath(file_full_path) != os.path.abspath(new_path):
+                    if is_name_conflict(file_full_path, new_path):
                         # 파일 이름에 번호 추가
                         base_name = new_name
                         counter = 1
@@ -864,8 +847,8 @@ class FileRenamerXApp:
                         new_name = f"{base_name} {counter:02d}"
                         new_path = os.path.join(dir_path, f"{new_name}{ext}")
                     
-                    # 파일 이름 변경
-                    os.rename(file_full_path, new_path)
+                    # 파일 이름 변경 (대상 이름의 중복 여부는 위에서 확인됨)
+                    os.replace(file_full_path, new_path)
                     new_filename = os.path.basename(new_path)
                     print(f"  ✓ 파일명 변경: {original_filename} > {new_filename}")
                     sys.stdout.flush()  # 명시적 flush 추가
@@ -900,7 +883,6 @@ class FileRenamerXApp:
         
         except Exception as e:
             print(f"❌ 비디오 처리 중 오류: {str(e)}")
-            import traceback
             print(f"❌ 오류 상세정보: {traceback.format_exc()}")
             sys.stdout.flush()  # 명시적 flush 추가
         
@@ -919,11 +901,36 @@ class FileRenamerXApp:
             print(f"  ⚠️ 처리량 조절: {len(frame_paths)}개 프레임 중 3개만 분석합니다.")
             sys.stdout.flush()  # 명시적 flush 추가
             frame_paths = frame_paths[:3]
+
+        # 여러 프레임은 한 번의 API 요청으로 일괄 분석 시도
+        # (결과가 없는 프레임만 아래에서 프레임별로 재시도, 성공한 결과는 캐시되어 다시 요청하지 않음)
+        batch_results = [None] * len(frame_paths)
+        if len(frame_paths) > 1 and self.running:
+            results = analyzer.analyze_images(frame_paths)
+            if results:
+                batch_results = results
+                video_results = [result for result in batch_results if result]
+                for result in video_results:
+                    print(f"    ✓ 분석 성공: {result}")
+                if len(video_results) == len(frame_paths):
+                    print(f"  ✓ 프레임 분석 완료: {len(video_results)}/{len(frame_paths)} 성공 (일괄 분석)")
+                    sys.stdout.flush()  # 명시적 flush 추가
+                    return video_results
+                if video_results:
+                    print(f"  ⚠️ 일괄 분석 {len(video_results)}/{len(frame_paths)} 성공 - 나머지 프레임은 개별 분석합니다.")
+                    sys.stdout.flush()  # 명시적 flush 추가
+
+        # 프레임별 결과 빈도 (다수결 조기 확정 판단용, 일괄 분석 결과 포함)
+        result_counter = Counter(video_results)
         
         for i, frame_path in enumerate(frame_paths, 1):
             if not self.running:
                 break
             
+            # 일괄 분석에서 이미 결과를 얻은 프레임은 건너뜀
+            if batch_results[i - 1]:
+                continue
+            
             # 파일 존재 확인
             if not os.path.exists(frame_path):
                 print(f"  ❌ 프레임 파일이 존재하지 않습니다: {frame_path}")
@@ -982,6 +989,16 @@ class FileRenamerXApp:
             # 최종 결과 처리
             if extracted_info:
                 video_results.append(extracted_info)
+                result_counter[extracted_info] += 1
+                
+                # 남은 프레임 결과와 관계없이 다수결이 확정되면 나머지 분석 생략
+                remaining = sum(1 for result in batch_results[i:] if not result)
+                top_counts = [count for _, count in result_counter.most_common(2)]
+                runner_up = top_counts[1] if len(top_counts) > 1 else 0
+                if remaining and top_counts[0] > remaining + runner_up:
+                    print(f"    ✓ 다수결 결과가 확정되어 남은 {remaining}개 프레임 분석을 생략합니다.")
+                    sys.stdout.flush()  # 명시적 flush 추가
+                    break
             else:
                 print(f"    ❌ 프레임 {i} 분석에 모든 시도가 실패했습니다.")
                 sys.stdout.flush()  # 명시적 flush 추가
@@ -1020,14 +1037,16 @@ class FileRenamerXApp:
             new_image_path = os.path.join(dir_path, f"{new_image_name}{ext}")
             
             # 이미 같은 이름의 파일이 있는지 확인
-            if os.path.exists(new_image_path) and os.path.abspath(file_full_path) != os.path.abspath(new_image_path):
+            if is_name_conflict(file_full_path, new_image_path):
+                # 경로 앞부분은 한 번만 만들고 반복문에서는 번호만 붙임
+                path_prefix = os.path.join(dir_path, new_image_name + "_")
                 counter = 1
-                while os.path.exists(os.path.join(dir_path, f"{new_image_name}_{counter}{ext}")):
+                while os.path.exists(path_prefix + str(counter) + ext):
                     counter += 1
-                new_image_path = os.path.join(dir_path, f"{new_image_name}_{counter}{ext}")
+                new_image_path = path_prefix + str(counter) + ext
             
-            # 파일 이름 변경
-            os.rename(file_full_path, new_image_path)
+            # 파일 이름 변경 (대상 이름의 중복 여부는 위에서 확인됨)
+            os.replace(file_full_path, new_image_path)
             new_filename = os.path.basename(new_image_path)
             print(f"  ✓ 파일명 변경: {original_filename} > {new_filename}")
             
@@ -1055,29 +1074,22 @@ class FileRenamerXApp:
         self.cleanup_temp_dir()
         
         # 작업폴더/output 폴더가 있다면 삭제
+        # (이름만 바꿔 즉시 비우고, 실제 삭제는 백그라운드 스레드에서 진행)
         try:
             work_dir = self.folder_path.get()
             output_dir = os.path.join(work_dir, "output")
-            if os.path.exists(output_dir) and os.path.isdir(output_dir):
-                shutil.rmtree(output_dir)
-                print(f"✓ 작업폴더 내 output 폴더 삭제 완료")
+            if os.path.isdir(output_dir):
+                # 같은 세션에서 반복 실행해도 이전 임시 폴더와 이름이 겹치지 않도록 고유한 이름 사용
+                trash_dir = f"{output_dir}{TRASH_DIR_MARKER}{os.getpid()}.{uuid.uuid4().hex}"
+                os.replace(output_dir, trash_dir)
+                self.delete_dir_in_background(trash_dir)
+                print(f"✓ 작업폴더 내 output 폴더 삭제 예약")
+        except FileNotFoundError:
+            # 이미 삭제된 경우 무시
+            pass
         except Exception as e:
             print(f"⚠️ output 폴더 삭제 중 오류: {str(e)}")
         
-        # 메모리 정리 및 COM 객체 정리
-        try:
-            import gc
-            gc.collect()
-            
-            # COM 객체 정리 (Windows 환경)
-            try:
-                import pythoncom
-                pythoncom.CoUninitialize()
-            except:
-                pass
-        except:
-            pass
-        
         # UI 상태 업데이트 (메인 스레드에서 실행)
         self.root.after(0, lambda: self.update_ui_for_processing(False))
         
@@ -1085,6 +1097,32 @@ class FileRenamerXApp:
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"\n[{current_time}] 작업 종료")
 
+    def delete_dir_in_background(self, path):
+        """폴더를 백그라운드 스레드에서 삭제 (삭제하지 못한 항목은 로그로 알림)"""
+        def on_error(failed_path, error):
+            if isinstance(error, FileNotFoundError):
+                # 다른 정리 작업에서 이미 삭제한 경우 무시
+                return
+            print(f"⚠️ 삭제 실패: {failed_path} ({error})")
+        
+        threading.Thread(
+            target=remove_tree,
+            args=(path, on_error),
+            daemon=True
+        ).start()
+
+    def remove_stale_trash_dirs(self, work_dir):
+        """이전 실행에서 남은 output 임시 폴더(output.trash.*) 삭제"""
+        prefix = "output" + TRASH_DIR_MARKER
+        try:
+            with os.scandir(work_dir) as entries:
+                stale_dirs = [entry.path for entry in entries if entry.is_dir() and entry.name.startswith(prefix)]
+        except OSError as e:
+            logger.warning(f"작업 폴더 확인 중 오류: {e}")
+            return
+        for stale_dir in stale_dirs:
+            self.delete_dir_in_background(stale_dir)
+
     def cleanup_memory(self):
         """메모리 정리"""
         try:
@@ -1093,14 +1131,6 @@ class FileRenamerXApp:
         except Exception:
             pass
             
-    def cleanup_com_objects(self):
-        """COM 객체 정리 (Windows 환경)"""
-        try:
-            import pythoncom
-            pythoncom.CoUninitialize()
-        except Exception:
-            pass
-
     def process_in_thread(self, current_mode, work_dir, output_dir, frame_times):
         """별도 스레드에서 작업 실행"""
         try:
@@ -1115,7 +1145,6 @@ class FileRenamerXApp:
             
         except Exception as e:
             print(f"\n❌ 예상치 못한 오류 발생: {str(e)}")
-            import traceback
             print(traceback.format_exc())  # 디버깅을 위한 스택 트레이스 출력
 
 def main():
@@ -1138,7 +1167,6 @@ def main():
     except Exception as e:
         # 예상치 못한 오류 처리
         logger.error(f"애플리케이션 실행 중 오류: {str(e)}")
-        import traceback
         logger.error(traceback.format_exc())
         
         # 메시지박스로 오류 표시
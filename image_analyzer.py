@@ -2,25 +2,380 @@
 # -*- coding: utf-8 -*-
 
 import os
+import io
+import re
+import atexit
+import stat
 import json
-import base64
-import requests
+import sqlite3
+import asyncio
+import httpx
 import time
 import random
+import hashlib
+import threading
+import functools
+import contextlib
+from collections import OrderedDict
 from abc import ABC, abstractmethod
+from PIL import Image
+
+try:
+    import pybase64 as base64  # 설치되어 있으면 SIMD 가속 base64 인코더 사용
+except ImportError:
+    import base64
+
+try:
+    import orjson  # 설치되어 있으면 더 빠른 JSON 파서 사용
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 from google.cloud import vision
 from google.oauth2 import service_account
-from openai import OpenAI
+from openai import OpenAI, APIStatusError, RateLimitError
+from google.api_core.exceptions import InvalidArgument, NotFound, PermissionDenied, ResourceExhausted, Unauthenticated
 import google.generativeai as genai
 
+# API 요청 제한 시간 (초) - 응답이 멈춘 요청이 재시도 루프를 오래 붙잡지 않도록
+API_CONNECT_TIMEOUT = 5
+API_REQUEST_TIMEOUT = 30
+
+# 분석기 간에 공유하는 HTTP 클라이언트 (요청마다 TLS 연결을 새로 맺지 않도록 재사용)
+_http_client = None
+
+def get_http_client():
+    """공유 HTTP 클라이언트 반환 (최초 호출 시 생성)"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+            timeout=httpx.Timeout(API_REQUEST_TIMEOUT, connect=API_CONNECT_TIMEOUT)
+        )
+        # 프로그램 종료 시 유지 중인 연결 정리
+        atexit.register(_http_client.close)
+    return _http_client
+
+@functools.lru_cache(maxsize=4)
+def get_openai_client(api_key):
+    """API 키별 공유 OpenAI 클라이언트 반환 (분석기 인스턴스 간 연결 풀 재사용)"""
+    return OpenAI(
+        api_key=api_key,
+        http_client=get_http_client(),
+        timeout=httpx.Timeout(API_REQUEST_TIMEOUT, connect=API_CONNECT_TIMEOUT)
+    )
+
+@functools.lru_cache(maxsize=4)
+def get_vision_client(credentials_path):
+    """인증 파일별 공유 Vision API 클라이언트 반환"""
+    credentials = service_account.Credentials.from_service_account_file(credentials_path)
+    return vision.ImageAnnotatorClient(credentials=credentials)
+
+def load_prompt():
+    """prompt.txt 내용 반환 (파일이 수정되지 않았으면 다시 읽지 않음)"""
+    return read_text_file('prompt.txt', os.stat('prompt.txt').st_mtime_ns, 'utf-8')
+
+def load_api_key(api_key_path):
+    """API 키 파일 내용 반환 (파일이 수정되지 않았으면 다시 읽지 않음)"""
+    return read_text_file(api_key_path, os.stat(api_key_path).st_mtime_ns)
+
+@functools.lru_cache(maxsize=8)
+def read_text_file(path, mtime_ns, encoding=None):
+    """수정 시각별로 캐시되는 텍스트 파일 읽기 (파일이 바뀌면 수정 시각이 달라져 다시 읽음)"""
+    with open(path, 'r', encoding=encoding) as f:
+        return f.read().strip()
+
+@functools.lru_cache(maxsize=1)
+def list_gemini_models():
+    """사용 가능한 Gemini 모델 이름 집합 반환 (프로세스당 한 번만 조회)"""
+    return frozenset(m.name for m in genai.list_models())
+
+# 기본 Gemini 모델과 목록 조회 실패 또는 기본 모델이 없을 때 사용할 대체 모델
+GEMINI_DEFAULT_MODEL = 'gemini-2.0-flash-lite'
+GEMINI_FALLBACK_MODEL = 'gemini-1.5-flash'
+
+def resolve_gemini_model_name():
+    """사용할 Gemini 모델 이름 결정 (기본 모델이 없거나 목록을 조회할 수 없으면 대체 모델)"""
+    try:
+        available_models = list_gemini_models()
+    except Exception as e:
+        # 조회 실패는 캐시되지 않으므로 다음 분석기 생성 시 다시 조회함
+        print(f"⚠️ Gemini 모델 목록을 조회할 수 없어 {GEMINI_FALLBACK_MODEL} 모델을 사용합니다: {str(e)}")
+        return GEMINI_FALLBACK_MODEL
+    if GEMINI_DEFAULT_MODEL not in available_models and f"models/{GEMINI_DEFAULT_MODEL}" not in available_models:
+        return GEMINI_FALLBACK_MODEL
+    return GEMINI_DEFAULT_MODEL
+
+@functools.lru_cache(maxsize=4)
+def get_gemini_model(model_name, api_key_hash):
+    """
+    모델 이름과 API 키별 공유 GenerativeModel 반환
+    
+    API 키는 genai.configure()로 전역 설정되지만, 모델 객체는 첫 요청 때 만든 클라이언트를 계속 사용하므로
+    키 파일이 바뀌면 새 모델 객체를 만들도록 키의 해시를 캐시 키에 포함한다 (함수 안에서는 사용하지 않음).
+    """
+    return genai.GenerativeModel(model_name)
+
+MAX_RETRY_DELAY = 60  # 재시도 대기 시간 상한 (초)
+RETRY_JITTER_MIN = 0.8  # 대기 시간에 곱하는 지터 범위: 0.8 ~ 1.2
+RETRY_JITTER_SPAN = 0.4
+
+def is_rate_limit_error(error):
+    """요청 한도 초과(429) 오류인지 확인"""
+    return isinstance(error, (RateLimitError, ResourceExhausted))
+
+def is_permanent_error(error):
+    """재시도해도 해결되지 않는 오류(잘못된 요청, 인증/권한 오류 등)인지 확인"""
+    if isinstance(error, (InvalidArgument, NotFound, PermissionDenied, Unauthenticated)):
+        return True
+    # 4xx 응답 중 시간 초과(408), 충돌(409), 요청 한도 초과(429)를 제외하면 재시도 의미 없음
+    return isinstance(error, APIStatusError) and 400 <= error.status_code < 500 and error.status_code not in (408, 409, 429)
+
+def get_retry_after(error):
+    """오류 응답의 Retry-After 헤더 값(초) 반환 (없으면 None)"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+def call_with_retry(request, max_retries, base_delay, label=None, deadline=None):
+    """
+    지수 백오프와 지터를 적용하여 API 요청 재시도
+    
+    Args:
+        request (callable): 한 번의 요청을 수행하는 함수 (일시적 오류는 예외 발생, 재시도가 무의미하면 None 반환)
+        max_retries (int): 최대 시도 횟수
+        base_delay (float): 기본 대기 시간 (초), 재시도마다 2배씩 증가
+        label (str): 로그에 표시할 API 이름 (None이면 로그를 출력하지 않음)
+        deadline (float): 재시도를 중단할 time.monotonic() 기준 시각 (None이면 제한 없음)
+    
+    Returns:
+        요청 결과 또는 None (재시도 불가 오류 또는 최대 재시도 횟수 초과)
+    """
+    last_error = None
+    for attempt in range(max_retries):
+        if attempt > 0:
+            # 2^n 공식 적용 (base_delay × 1, 2, 4, 8...) + 약간의 랜덤성 추가 (지터)
+            delay = base_delay * (2 ** (attempt - 1)) * (RETRY_JITTER_MIN + RETRY_JITTER_SPAN * random.random())
+            # 서버가 대기 시간(Retry-After)을 알려준 경우 그보다 일찍 재시도하지 않음
+            retry_after = get_retry_after(last_error)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            delay = min(delay, MAX_RETRY_DELAY)
+            # 이미지당 시간 제한을 넘기면 더 이상 재시도하지 않음
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if label:
+                        print(f"❌ [{label} 오류] 분석 시간 제한을 초과했습니다. 재시도를 중단합니다.")
+                    return None
+                delay = min(delay, remaining)
+            if label:
+                print(f"  ⚠️ [{label} 재시도] {attempt}/{max_retries} (대기: {delay:.2f}초)")
+            time.sleep(delay)
+        
+        try:
+            with api_request_slot():
+                return request()
+        except Exception as e:
+            last_error = e
+            if label:
+                print(f"❌ [{label} 오류] API 호출 중 오류: {str(e)}")
+                if is_rate_limit_error(e):
+                    print(f"⚠️ [{label} 오류] 요청 한도 초과 (Rate Limit) - 지수 백오프 적용 중...")
+            if is_permanent_error(e):
+                return None
+    
+    if label:
+        print(f"❌ [{label} 오류] 최대 재시도 횟수({max_retries}회)를 초과했습니다. 분석에 실패했습니다.")
+    return None
+
+# 지원하는 이미지 확장자와 MIME 타입
+IMAGE_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.bmp': 'image/bmp',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+}
+
+# 파일 시그니처(매직 바이트)와 MIME 타입
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG", "image/png"),
+    (b"GIF8", "image/gif"),
+    (b"RIFF", "image/webp"),  # 8~12 바이트가 WEBP인 경우만
+    (b"BM", "image/bmp"),
+)
+
+# 업로드 전 이미지 축소 설정 (Vision 모델이 실제로 활용하는 해상도 기준)
+UPLOAD_MAX_EDGE = 1568  # 긴 변 최대 픽셀
+UPLOAD_JPEG_QUALITY = 80
+UPLOAD_RESIZE_THRESHOLD = 300 * 1024  # 이보다 작은 이미지는 그대로 업로드
+
+def prepare_for_upload(content, mime_type):
+    """
+    업로드 전 큰 이미지를 축소하고 JPEG로 재압축
+    
+    Args:
+        content (bytes): 원본 이미지 데이터
+        mime_type (str): 원본 MIME 타입
+    
+    Returns:
+        tuple: (업로드할 이미지 데이터, MIME 타입) - 작은 이미지이거나 변환 실패 시 원본 그대로
+    """
+    if len(content) < UPLOAD_RESIZE_THRESHOLD:
+        return content, mime_type
+    
+    try:
+        with Image.open(io.BytesIO(content)) as img:
+            img.thumbnail((UPLOAD_MAX_EDGE, UPLOAD_MAX_EDGE), Image.LANCZOS)
+            buffer = io.BytesIO()
+            img.convert('RGB').save(buffer, 'JPEG', quality=UPLOAD_JPEG_QUALITY, optimize=True)
+    except Exception:
+        return content, mime_type
+    
+    resized = buffer.getvalue()
+    if len(resized) >= len(content):
+        return content, mime_type
+    return resized, "image/jpeg"
+
+def to_data_url(data, mime_type):
+    """이미지 데이터를 base64 data URL 문자열로 변환 (bytes로 조립 후 ASCII로 한 번만 디코딩)"""
+    return (b"data:" + mime_type.encode('ascii') + b";base64," + base64.b64encode(data)).decode('ascii')
+
+# 분석 결과 형식 '[~동] [~호] [배관종류] [배관명]' (형식에 맞는 결과만 캐시에 저장)
+VALID_FORMAT_PATTERN = re.compile(r'\[\S+동\] \[\S+호\] \[\S+\] \[\S+\]')
+
+def is_valid_result(result):
+    """분석 결과가 비어 있지 않고 요구 형식에 맞는지 확인"""
+    return bool(result) and VALID_FORMAT_PATTERN.match(result) is not None
+
+# 분석 결과 캐시 (이미지 내용 해시 기반 LRU, 모든 분석기 인스턴스가 공유)
+MAX_RESULT_CACHE_SIZE = 512
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+# 실행 간에 유지되는 분석 결과 캐시 (SQLite 파일, 메모리 캐시에 없을 때 조회)
+PERSISTENT_CACHE_PATH = os.path.join('.cache', 'analysis_cache.sqlite3')
+_persistent_cache = None
+_persistent_cache_lock = threading.Lock()
+_persistent_cache_enabled = True
+
+def set_persistent_cache_enabled(enabled):
+    """영구 캐시 사용 여부 설정 (False이면 이전 실행의 결과를 읽지도 저장하지도 않음)"""
+    global _persistent_cache_enabled
+    _persistent_cache_enabled = enabled
+
+def clear_result_cache():
+    """메모리 캐시와 영구 캐시에 저장된 분석 결과를 모두 삭제"""
+    with _result_cache_lock:
+        _result_cache.clear()
+    with _persistent_cache_lock:
+        connection = get_persistent_cache()
+        if connection is None:
+            return
+        try:
+            connection.execute("DELETE FROM results")
+            connection.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ 분석 결과 캐시를 비우지 못했습니다: {str(e)}")
+
+def get_persistent_cache():
+    """영구 캐시 DB 연결 반환 (최초 호출 시 생성, 사용할 수 없으면 None)"""
+    global _persistent_cache
+    if _persistent_cache is None:
+        try:
+            os.makedirs(os.path.dirname(PERSISTENT_CACHE_PATH), exist_ok=True)
+            connection = sqlite3.connect(PERSISTENT_CACHE_PATH, check_same_thread=False)
+            connection.execute("CREATE TABLE IF NOT EXISTS results (cache_key TEXT PRIMARY KEY, result TEXT NOT NULL)")
+            connection.commit()
+            _persistent_cache = connection
+        except Exception as e:
+            print(f"⚠️ 분석 결과 캐시 파일을 사용할 수 없습니다: {str(e)}")
+            _persistent_cache = False
+    return _persistent_cache or None
+
+def load_persistent_result(cache_key):
+    """영구 캐시에서 분석 결과 조회 (없거나 영구 캐시를 사용하지 않으면 None)"""
+    if not _persistent_cache_enabled:
+        return None
+    with _persistent_cache_lock:
+        connection = get_persistent_cache()
+        if connection is None:
+            return None
+        try:
+            row = connection.execute(
+                "SELECT result FROM results WHERE cache_key = ?", (json.dumps(cache_key),)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+    return row[0] if row else None
+
+def save_persistent_result(cache_key, result):
+    """영구 캐시에 분석 결과 저장 (영구 캐시를 사용하지 않으면 무시)"""
+    if not _persistent_cache_enabled:
+        return
+    with _persistent_cache_lock:
+        connection = get_persistent_cache()
+        if connection is None:
+            return
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO results (cache_key, result) VALUES (?, ?)", (json.dumps(cache_key), result)
+            )
+            connection.commit()
+        except sqlite3.Error:
+            pass
+
+# 진행 중인 분석 요청 (캐시 키 -> {"done": 완료 이벤트, "result": 결과}), 같은 이미지의 동시 요청을 하나로 합침
+_inflight_requests = {}
+_inflight_lock = threading.Lock()
+
+class RateLimiter:
+    """요청 시작 간격을 일정하게 유지하는 요청 속도 제한기 (여러 스레드에서 공유 가능)"""
+    
+    def __init__(self, max_per_second):
+        self.min_interval = 1.0 / max_per_second
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """다음 요청을 시작할 수 있을 때까지 대기"""
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+# 프로세스 전체의 API 요청 제한 (분석기, 비디오, 재시도에 관계없이 모든 실제 요청에 적용)
+MAX_CONCURRENT_REQUESTS = 4  # 동시에 진행할 최대 API 요청 수 (요청 한도 고려)
+MAX_REQUESTS_PER_SECOND = 5  # 초당 시작할 수 있는 최대 API 요청 수
+_api_request_semaphore = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+_api_rate_limiter = RateLimiter(MAX_REQUESTS_PER_SECOND)
+
+@contextlib.contextmanager
+def api_request_slot():
+    """API 요청 한 번을 감싸 동시 요청 수와 초당 요청 수 제한을 적용"""
+    with _api_request_semaphore:
+        _api_rate_limiter.acquire()
+        yield
+
 class ImageAnalyzer(ABC):
     """이미지 분석기 추상 클래스"""
     
+    MAX_BATCH_SIZE = 8  # 한 번의 요청에 포함할 최대 이미지 수
+    MAX_ANALYSIS_SECONDS = 90  # 이미지 하나의 분석(재시도 포함)에 허용하는 최대 시간 (초)
+    
     def __init__(self):
         # prompt.txt 파일 로드
         try:
-            with open('prompt.txt', 'r', encoding='utf-8') as f:
-                self.prompt = f.read().strip()
+            self.prompt = load_prompt()
                 
             # 프롬프트가 비어있는지 확인
             if not self.prompt:
@@ -31,6 +386,10 @@ class ImageAnalyzer(ABC):
             raise UnicodeDecodeError("prompt.txt 파일을 읽는 중 인코딩 오류가 발생했습니다. UTF-8 형식인지 확인하세요.")
         except Exception as e:
             raise Exception(f"프롬프트 파일 로드 중 오류 발생: {str(e)}")
+        
+        # 캐시 키 구성 요소 (프롬프트가 바뀌면 이전 결과를 사용하지 않도록)
+        self.prompt_hash = hashlib.blake2b(self.prompt.encode('utf-8'), digest_size=16).hexdigest()
+        self.model_name = None
     
     @abstractmethod
     def analyze_image(self, image_path):
@@ -44,7 +403,250 @@ class ImageAnalyzer(ABC):
             str: 이미지에서 추출된 정보
         """
         pass
-    
+
+    async def analyze_image_async(self, image_path, semaphore=None):
+        """
+        이미지 분석을 작업 스레드에서 실행 (이벤트 루프를 막지 않음)
+        
+        실제 API 요청의 동시 실행 수와 속도 제한은 api_request_slot()에서 프로세스 전체에 적용된다.
+
+        Args:
+            image_path (str): 이미지 파일 경로
+            semaphore (asyncio.Semaphore): 동시에 실행할 분석 작업 수 제한용 세마포어
+
+        Returns:
+            str: 이미지에서 추출된 정보
+        """
+        if semaphore is None:
+            return await asyncio.to_thread(self.analyze_image, image_path)
+        async with semaphore:
+            return await asyncio.to_thread(self.analyze_image, image_path)
+
+    async def analyze_images_async(self, image_paths, concurrency=None):
+        """
+        여러 이미지를 동시에 분석하여 네트워크 대기 시간을 겹침
+
+        Args:
+            image_paths (list): 이미지 파일 경로 리스트
+            concurrency (int): 동시 요청 수 (기본값: MAX_CONCURRENT_REQUESTS)
+
+        Returns:
+            list: 이미지 순서대로의 추출 정보 리스트 (실패한 이미지는 None)
+        """
+        semaphore = asyncio.Semaphore(concurrency or MAX_CONCURRENT_REQUESTS)
+        results = await asyncio.gather(
+            *[self.analyze_image_async(image_path, semaphore) for image_path in image_paths],
+            return_exceptions=True
+        )
+        return [None if isinstance(result, Exception) else result for result in results]
+
+    def analyze_images(self, image_paths):
+        """
+        여러 이미지를 MAX_BATCH_SIZE개씩 묶어 요청 단위로 일괄 분석
+
+        Args:
+            image_paths (list): 이미지 파일 경로 리스트
+
+        Returns:
+            list or None: 이미지 순서대로의 추출 정보 리스트 또는 None (일괄 분석 불가 또는 실패)
+        """
+        if not image_paths:
+            return None
+
+        results = []
+        for start in range(0, len(image_paths), self.MAX_BATCH_SIZE):
+            batch_results = self.analyze_image_batch(image_paths[start:start + self.MAX_BATCH_SIZE])
+            if batch_results is None:
+                return None
+            results.extend(batch_results)
+        return results
+
+    def analyze_image_batch(self, image_paths):
+        """
+        한 번의 요청으로 여러 이미지 분석 (지원하지 않는 분석기는 None 반환)
+
+        Args:
+            image_paths (list): 이미지 파일 경로 리스트 (최대 MAX_BATCH_SIZE개)
+
+        Returns:
+            list or None: 이미지 순서대로의 추출 정보 리스트 또는 None
+        """
+        return None
+
+    def load_batch_images(self, image_paths, max_size):
+        """
+        일괄 분석할 이미지 로드 및 캐시 조회
+
+        Args:
+            image_paths (list): 이미지 파일 경로 리스트
+            max_size (int): 허용되는 최대 파일 크기 (바이트)
+
+        Returns:
+            list or None: [(절대 경로, 캐시 키, 이미지 데이터, 캐시된 결과)] 또는 None (하나라도 로드 실패)
+        """
+        images = []
+        try:
+            for image_path in image_paths:
+                abs_path = self.check_file_exists(image_path)
+                if not abs_path:
+                    return None
+                image_data = self.read_image_file(abs_path, max_size)
+                if image_data is None:
+                    return None
+                cache_key = self.get_cache_key(image_data)
+                images.append((abs_path, cache_key, image_data, self.get_cached_result(cache_key)))
+        except Exception:
+            return None
+        return images
+
+    @staticmethod
+    def read_image_file(abs_path, max_size):
+        """
+        크기 제한을 확인하면서 이미지 파일을 한 번에 읽음 (별도의 크기 조회 없이)
+
+        Args:
+            abs_path (str): 이미지 파일 절대 경로
+            max_size (int): 허용되는 최대 파일 크기 (바이트)
+
+        Returns:
+            bytes or None: 이미지 데이터 또는 None (최대 크기 초과)
+        """
+        with open(abs_path, "rb") as image_file:
+            image_data = image_file.read(max_size + 1)
+        if len(image_data) > max_size:
+            return None
+        return image_data
+
+    @staticmethod
+    def get_mime_type(abs_path, image_data=b""):
+        """
+        이미지 MIME 타입 결정 (파일 시그니처 우선, 알 수 없으면 확장자 기준)
+
+        Args:
+            abs_path (str): 이미지 파일 경로
+            image_data (bytes): 이미 읽어 둔 이미지 데이터 (확장자와 실제 형식이 다른 파일 대응)
+
+        Returns:
+            str: MIME 타입
+        """
+        for signature, mime_type in IMAGE_SIGNATURES:
+            if image_data.startswith(signature):
+                if mime_type == "image/webp" and image_data[8:12] != b"WEBP":
+                    break
+                return mime_type
+        _, ext = os.path.splitext(abs_path)
+        return IMAGE_MIME_TYPES.get(ext.lower(), "image/jpeg")  # 기본값: JPEG
+
+    @staticmethod
+    def get_batch_instruction(image_count):
+        """일괄 분석 요청 시 결과 형식 지시문"""
+        return (f"다음 {image_count}개의 이미지를 각각 분석해서 요청한 정보를 추출해주세요. "
+                "결과는 이미지 순서대로 문자열 JSON 배열로만 출력해주세요.")
+
+    @staticmethod
+    def parse_batch_results(content, expected_count):
+        """
+        일괄 분석 응답(JSON 배열) 파싱
+
+        Args:
+            content (str): 모델 응답 텍스트
+            expected_count (int): 기대하는 결과 개수
+
+        Returns:
+            list or None: 결과 리스트 또는 None (형식 오류)
+        """
+        try:
+            # 코드 블록(```json ... ```)으로 감싸진 응답 처리
+            content = content.strip()
+            if content.startswith("```"):
+                content = content.strip('`')
+                if content.startswith('json'):
+                    content = content[4:]
+
+            results = json_loads(content)
+        except Exception:
+            return None
+
+        if not isinstance(results, list) or len(results) != expected_count:
+            return None
+        return [str(result).strip() if result else None for result in results]
+
+    def get_cache_key(self, content):
+        """
+        이미지 내용, 프롬프트, 분석기/모델 종류로 분석 결과 캐시 키 생성
+        
+        Args:
+            content (bytes): 이미지 파일 내용
+            
+        Returns:
+            tuple: 캐시 키
+        """
+        image_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
+        return (type(self).__name__, self.model_name, self.prompt_hash, image_hash)
+
+    def get_cached_result(self, cache_key):
+        """캐시된 분석 결과 반환 (메모리 캐시 -> 영구 캐시 순으로 조회, 없으면 None)"""
+        with _result_cache_lock:
+            result = _result_cache.get(cache_key)
+            if result is not None:
+                _result_cache.move_to_end(cache_key)
+                return result
+        
+        # 이전 실행에서 저장된 결과가 있으면 메모리 캐시에도 올려둠
+        result = load_persistent_result(cache_key)
+        if result is not None:
+            self.store_cached_result(cache_key, result, persist=False)
+        return result
+
+    def store_cached_result(self, cache_key, result, persist=True):
+        """분석 결과를 캐시에 저장 (최대 개수 초과 시 가장 오래된 항목 제거, persist=True면 영구 캐시에도 저장)"""
+        if not result:
+            return
+        with _result_cache_lock:
+            _result_cache[cache_key] = result
+            _result_cache.move_to_end(cache_key)
+            while len(_result_cache) > MAX_RESULT_CACHE_SIZE:
+                _result_cache.popitem(last=False)
+        if persist:
+            save_persistent_result(cache_key, result)
+
+    def run_single_flight(self, cache_key, request):
+        """
+        같은 캐시 키의 분석이 이미 진행 중이면 API를 다시 호출하지 않고 그 결과를 기다려 사용
+        
+        Args:
+            cache_key (tuple): 분석 결과 캐시 키
+            request (callable): 실제 분석을 수행하는 함수
+        
+        Returns:
+            str: 추출된 정보 또는 None (실패 시)
+        """
+        with _inflight_lock:
+            inflight = _inflight_requests.get(cache_key)
+            is_owner = inflight is None
+            if is_owner:
+                inflight = _inflight_requests[cache_key] = {"done": threading.Event(), "result": None}
+        
+        if not is_owner:
+            # 먼저 시작한 요청의 결과를 그대로 사용 (형식이 맞지 않아 캐시되지 않은 결과 포함)
+            inflight["done"].wait()
+            return inflight["result"]
+        
+        try:
+            # 캐시 확인 후 소유권을 얻기 전에 다른 요청이 끝났을 수 있으므로 다시 확인
+            result = inflight["result"] = self.get_cached_result(cache_key)
+            if result is not None:
+                return result
+            result = inflight["result"] = request()
+            # 형식에 맞지 않는 결과는 캐시하지 않아 다음 분석에서 새로 요청하도록 함
+            if is_valid_result(result):
+                self.store_cached_result(cache_key, result)
+            return result
+        finally:
+            with _inflight_lock:
+                del _inflight_requests[cache_key]
+            inflight["done"].set()
+
     def check_file_exists(self, image_path):
         """
         파일 존재 여부 확인 및 절대 경로 반환
@@ -62,19 +664,14 @@ class ImageAnalyzer(ABC):
             # 절대 경로로 변환
             abs_path = os.path.abspath(image_path)
             
-            # 파일 존재 확인
-            if not os.path.isfile(abs_path):
+            # 파일 확장자 확인 (파일 시스템 접근 없이 먼저 걸러냄)
+            _, ext = os.path.splitext(abs_path)
+            if ext.lower() not in IMAGE_MIME_TYPES:
                 return None
                 
-            # 유효한 이미지 파일인지 확인 (크기 확인)
-            file_size = os.path.getsize(abs_path)
-            if file_size == 0:
-                return None
-                
-            # 파일 확장자 확인
-            _, ext = os.path.splitext(abs_path)
-            valid_exts = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp']
-            if ext.lower() not in valid_exts:
+            # 파일 존재 및 크기 확인 (stat 한 번으로 처리)
+            file_stat = os.stat(abs_path)
+            if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_size == 0:
                 return None
                 
             return abs_path
@@ -85,9 +682,17 @@ class ImageAnalyzer(ABC):
 class GoogleVisionAnalyzer(ImageAnalyzer):
     """Google Vision API와 ChatGPT API를 사용한 이미지 분석기"""
     
+    MAX_BATCH_SIZE = 16  # batch_annotate_images 한 번에 보낼 수 있는 최대 이미지 수
+    
     def __init__(self):
         super().__init__()
         
+        # 요청마다 다시 만들지 않도록 시스템 메시지를 미리 구성
+        self.system_message = {
+            "role": "system",
+            "content": f"당신은 이미지에서 추출된 텍스트를 분석하여 필요한 정보를 추출하는 전문가입니다. 다음 지시에 따라 텍스트를 분석해주세요: {self.prompt}"
+        }
+        
         # Google Vision API 클라이언트 초기화
         try:
             credentials_path = 'vision-api-key/vision-ocr-454121-572fb601794b.json'
@@ -96,8 +701,7 @@ class GoogleVisionAnalyzer(ImageAnalyzer):
             if not os.path.exists(credentials_path):
                 raise FileNotFoundError(f"Google Vision API 키 파일을 찾을 수 없습니다: {credentials_path}")
                 
-            credentials = service_account.Credentials.from_service_account_file(credentials_path)
-            self.vision_client = vision.ImageAnnotatorClient(credentials=credentials)
+            self.vision_client = get_vision_client(credentials_path)
         except FileNotFoundError as e:
             raise e
         except Exception as e:
@@ -107,18 +711,18 @@ class GoogleVisionAnalyzer(ImageAnalyzer):
         try:
             api_key_path = 'chatgpt-api-key/chatgpt_api_key.txt'
             
-            # 키 파일 존재 확인
-            if not os.path.exists(api_key_path):
+            # 키 파일 로드 (프로세스당 한 번만 읽음)
+            try:
+                api_key = load_api_key(api_key_path)
+            except FileNotFoundError:
                 raise FileNotFoundError(f"ChatGPT API 키 파일을 찾을 수 없습니다: {api_key_path}")
                 
-            with open(api_key_path, 'r') as f:
-                api_key = f.read().strip()
-                
             # API 키가 비어있는지 확인
             if not api_key:
                 raise ValueError("ChatGPT API 키가 비어 있습니다.")
                 
-            self.openai_client = OpenAI(api_key=api_key)
+            self.openai_client = get_openai_client(api_key)
+            self.model_name = "gpt-4o"
         except FileNotFoundError as e:
             raise e
         except ValueError as e:
@@ -137,116 +741,218 @@ class GoogleVisionAnalyzer(ImageAnalyzer):
             str: 이미지에서 추출된 정보
         """
         max_retries = 5  # 최대 재시도 횟수 증가 (3 -> 5)
-        retry_count = 0
         base_delay = 2  # 기본 대기 시간
         
-        while retry_count < max_retries:
+        # 파일 존재 확인
+        abs_path = self.check_file_exists(image_path)
+        if not abs_path:
+            print(f"❌ [Vision API 오류] 유효하지 않은 이미지 파일: {image_path}")
+            return None
+            
+        # 이미지 로드 (재시도 시에도 같은 데이터를 재사용)
+        try:
+            with open(abs_path, 'rb') as image_file:
+                content = image_file.read()
+        except PermissionError as e:
+            print(f"❌ [Vision API 오류] 파일 접근 권한이 없습니다: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"❌ [Vision API 오류] 이미지 로드 중 오류: {str(e)}")
+            return None
+        
+        # 동일한 이미지의 이전 분석 결과가 있으면 API 호출 생략
+        cache_key = self.get_cache_key(content)
+        cached_result = self.get_cached_result(cache_key)
+        if cached_result is not None:
+            print(f"  ✓ [캐시] 이전 분석 결과를 사용합니다.")
+            return cached_result
+        
+        # 같은 이미지를 분석 중인 요청이 있으면 그 결과를 함께 사용
+        return self.run_single_flight(
+            cache_key, lambda: self.analyze_content(content, cache_key[-1], max_retries, base_delay)
+        )
+    
+    def analyze_content(self, content, image_hash, max_retries, base_delay):
+        """
+        OCR 후 ChatGPT 분석 수행 (단계별 재시도)
+        
+        Args:
+            content (bytes): 이미지 데이터
+            image_hash (str): 이미지 내용 해시
+            max_retries (int): 단계별 최대 시도 횟수
+            base_delay (float): 기본 대기 시간 (초)
+        
+        Returns:
+            str: 이미지에서 추출된 정보 또는 None
+        """
+        deadline = time.monotonic() + self.MAX_ANALYSIS_SECONDS
+        
+        # OCR 결과는 이미지 내용에만 의존하므로 프롬프트가 바뀌어도 재사용
+        ocr_cache_key = ("VisionOCR", image_hash)
+        detected_text = self.get_cached_result(ocr_cache_key)
+        
+        # OCR과 ChatGPT 분석을 각각 재시도 (ChatGPT 단계 실패 시 OCR을 다시 요청하지 않음)
+        if detected_text is None:
+            detected_text = call_with_retry(lambda: self.request_ocr(content), max_retries, base_delay, "Vision API", deadline)
+            if detected_text is None:
+                return None
+            self.store_cached_result(ocr_cache_key, detected_text)
+        else:
+            print(f"  ✓ [캐시] 이전 OCR 결과를 사용합니다.")
+        
+        return call_with_retry(lambda: self.request_text_analysis(detected_text), max_retries, base_delay, "ChatGPT", deadline)
+    
+    def request_ocr(self, content):
+        """
+        Vision API로 OCR 1회 요청
+        
+        Args:
+            content (bytes): 이미지 데이터
+        
+        Returns:
+            str or None: 추출된 전체 텍스트 또는 None (재시도해도 해결되지 않는 오류)
+        """
+        print(f"  ✓ Vision API OCR 요청 중...")
+        image = vision.Image(content=content)
+        response = self.vision_client.text_detection(image=image, timeout=API_REQUEST_TIMEOUT)
+        
+        if response.error.message:
+            # 네트워크 관련 오류는 재시도
+            if any(err in response.error.message.lower() for err in ['network', 'timeout', 'connection']):
+                raise ConnectionError(f"네트워크 오류: {response.error.message}")
+            print(f"❌ [Vision API 오류] OCR 실패: {response.error.message}")
+            return None
+        
+        # OCR 결과 추출
+        texts = response.text_annotations
+        if not texts:
+            print(f"❌ [Vision API 오류] 텍스트가 감지되지 않았습니다.")
+            return None
+        
+        # 전체 텍스트 추출 (첫 번째 항목은 전체 텍스트)
+        detected_text = texts[0].description
+        
+        # 텍스트가 비어있는지 확인
+        if not detected_text.strip():
+            print(f"❌ [Vision API 오류] 추출된 텍스트가 비어있습니다.")
+            return None
+        
+        print(f"  ✓ OCR 텍스트 추출 완료 ({len(detected_text)} 자)")
+        return detected_text
+    
+    def request_text_analysis(self, detected_text):
+        """
+        ChatGPT로 OCR 텍스트 분석 1회 요청
+        
+        Args:
+            detected_text (str): OCR로 추출된 텍스트
+        
+        Returns:
+            str: 텍스트에서 추출된 정보
+        """
+        print(f"  ✓ ChatGPT 분석 요청 중...")
+        chat_response = self.openai_client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                self.system_message,
+                {"role": "user", "content": detected_text}
+            ],
+            temperature=0.3,
+            max_tokens=100
+        )
+        
+        try:
+            extracted_info = chat_response.choices[0].message.content.strip()
+        except (AttributeError, IndexError):
+            raise ValueError("유효하지 않은 응답 형식입니다.")
+        
+        print(f"  ✓ [ChatGPT 분석 성공] 결과를 받았습니다.")
+        return extracted_info
+    
+    def analyze_image_batch(self, image_paths):
+        """
+        Vision API 일괄 OCR(batch_annotate_images) 후 ChatGPT 한 번의 요청으로 모든 텍스트 분석
+        
+        Args:
+            image_paths (list): 이미지 파일 경로 리스트 (최대 MAX_BATCH_SIZE개)
+        
+        Returns:
+            list or None: 이미지 순서대로의 추출 정보 리스트 또는 None (실패 시 개별 분석으로 대체)
+        """
+        images = self.load_batch_images(image_paths, 20 * 1024 * 1024)  # 20MB
+        if images is None:
+            return None
+        
+        # 캐시에 없는 이미지만 분석
+        results = [cached_result for _, _, _, cached_result in images]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        
+        # 캐시된 OCR 결과가 없는 이미지만 Vision API에 일괄 요청
+        detected_texts = {}
+        for i in pending:
+            detected_text = self.get_cached_result(("VisionOCR", images[i][1][-1]))
+            if detected_text is not None:
+                detected_texts[i] = detected_text
+        ocr_pending = [i for i in pending if i not in detected_texts]
+        
+        if ocr_pending:
             try:
-                # 파일 존재 확인
-                abs_path = self.check_file_exists(image_path)
-                if not abs_path:
-                    print(f"❌ [Vision API 오류] 유효하지 않은 이미지 파일: {image_path}")
-                    return None
-                    
-                # 이미지 로드
-                try:
-                    with open(abs_path, 'rb') as image_file:
-                        content = image_file.read()
-                except PermissionError as e:
-                    print(f"❌ [Vision API 오류] 파일 접근 권한이 없습니다: {str(e)}")
-                    return None
-                except Exception as e:
-                    print(f"❌ [Vision API 오류] 이미지 로드 중 오류: {str(e)}")
-                    return None
-                
-                # 지수 백오프 적용
-                if retry_count > 0:
-                    # 2^n 공식 적용 (2, 4, 8, 16, 32초)
-                    current_delay = base_delay * (2 ** (retry_count - 1))
-                    # 약간의 랜덤성 추가 (지터)
-                    jitter = random.uniform(0.8, 1.2)
-                    delay_with_jitter = current_delay * jitter
-                    
-                    print(f"  ⚠️ [Vision API 재시도] {retry_count}/{max_retries} (대기: {delay_with_jitter:.2f}초)")
-                    time.sleep(delay_with_jitter)
-                
-                # Vision API로 OCR 수행
-                try:
-                    print(f"  ✓ Vision API OCR 요청 중...")
-                    image = vision.Image(content=content)
-                    response = self.vision_client.text_detection(image=image)
-                    
-                    if response.error.message:
-                        # 네트워크 관련 오류는 재시도
-                        if any(err in response.error.message.lower() for err in ['network', 'timeout', 'connection']):
-                            retry_count += 1
-                            print(f"❌ [Vision API 오류] 네트워크 오류: {response.error.message}")
-                            continue
-                        else:
-                            print(f"❌ [Vision API 오류] OCR 실패: {response.error.message}")
-                            return None
-                except Exception as e:
-                    retry_count += 1
-                    print(f"❌ [Vision API 오류] API 호출 중 오류: {str(e)}")
-                    continue
-                
-                # OCR 결과 추출
-                texts = response.text_annotations
-                if not texts:
-                    print(f"❌ [Vision API 오류] 텍스트가 감지되지 않았습니다.")
+                print(f"  ✓ Vision API 일괄 OCR 요청 중... ({len(ocr_pending)}개 이미지)")
+                with api_request_slot():
+                    response = self.vision_client.batch_annotate_images(requests=[
+                        vision.AnnotateImageRequest(
+                            image=vision.Image(content=images[i][2]),
+                            features=[vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)]
+                        )
+                        for i in ocr_pending
+                    ], timeout=API_REQUEST_TIMEOUT)
+            except Exception:
+                return None
+            
+            for i, annotation in zip(ocr_pending, response.responses):
+                # 오류가 있거나 텍스트가 없는 이미지는 개별 분석에서 원인을 출력하도록 위임
+                if annotation.error.message or not annotation.text_annotations:
                     return None
-                
-                # 전체 텍스트 추출 (첫 번째 항목은 전체 텍스트)
-                detected_text = texts[0].description
-                
-                # 텍스트가 비어있는지 확인
+                detected_text = annotation.text_annotations[0].description
                 if not detected_text.strip():
-                    print(f"❌ [Vision API 오류] 추출된 텍스트가 비어있습니다.")
                     return None
-                
-                print(f"  ✓ OCR 텍스트 추출 완료 ({len(detected_text)} 자)")
-                
-                # ChatGPT API를 사용하여 텍스트 분석
-                system_msg = f"당신은 이미지에서 추출된 텍스트를 분석하여 필요한 정보를 추출하는 전문가입니다. 다음 지시에 따라 텍스트를 분석해주세요: {self.prompt}"
-                
-                try:
-                    print(f"  ✓ ChatGPT 분석 요청 중...")
-                    chat_response = self.openai_client.chat.completions.create(
-                        model="gpt-4o",
-                        messages=[
-                            {"role": "system", "content": system_msg},
-                            {"role": "user", "content": detected_text}
-                        ],
-                        temperature=0.3,
-                        max_tokens=100
-                    )
-                    
-                    if chat_response and hasattr(chat_response, 'choices') and len(chat_response.choices) > 0:
-                        extracted_info = chat_response.choices[0].message.content.strip()
-                        print(f"  ✓ [ChatGPT 분석 성공] 결과를 받았습니다.")
-                        return extracted_info
-                    else:
-                        # ChatGPT API 응답 오류 재시도
-                        retry_count += 1
-                        print(f"❌ [ChatGPT 오류] 유효하지 않은 응답 형식입니다.")
-                        continue
-                except Exception as e:
-                    # API 호출 오류 재시도
-                    retry_count += 1
-                    print(f"❌ [ChatGPT 오류] API 호출 중 오류: {str(e)}")
-                    
-                    # 429 에러 감지 (Too Many Requests)
-                    if "429" in str(e) or "rate limit" in str(e).lower() or "too many requests" in str(e).lower():
-                        print(f"⚠️ [ChatGPT 오류] 요청 한도 초과 (Rate Limit) - 지수 백오프 적용 중...")
-                    continue
-                
-            except Exception as e:
-                retry_count += 1
-                print(f"❌ [Vision+ChatGPT 오류] 예상치 못한 오류 발생: {str(e)}")
-                continue
+                detected_texts[i] = detected_text
+                self.store_cached_result(("VisionOCR", images[i][1][-1]), detected_text)
         
-        print(f"❌ [Vision+ChatGPT 오류] 최대 재시도 횟수({max_retries}회)를 초과했습니다. 분석에 실패했습니다.")
-        return None
+        # ChatGPT API로 모든 텍스트를 한 번에 분석
+        numbered_texts = "\n\n".join(
+            f"[텍스트 {n}]\n{detected_texts[i]}" for n, i in enumerate(pending, 1)
+        )
+        user_msg = (f"다음 {len(pending)}개의 텍스트를 각각 분석해서 요청한 정보를 추출해주세요. "
+                    f"결과는 텍스트 순서대로 문자열 JSON 배열로만 출력해주세요.\n\n{numbered_texts}")
+        
+        try:
+            print(f"  ✓ ChatGPT 일괄 분석 요청 중... ({len(pending)}개 텍스트)")
+            with api_request_slot():
+                chat_response = self.openai_client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        self.system_message,
+                        {"role": "user", "content": user_msg}
+                    ],
+                    temperature=0.3,
+                    max_tokens=100 * len(pending)
+                )
+            batch_results = self.parse_batch_results(chat_response.choices[0].message.content, len(pending))
+        except Exception:
+            return None
+        
+        if batch_results is None:
+            return None
+        
+        for i, result in zip(pending, batch_results):
+            results[i] = result
+            # 일괄 분석 결과는 형식에 맞는 것만 이번 실행 동안 메모리에만 캐시 (영구 캐시에는 저장하지 않음)
+            if is_valid_result(result):
+                self.store_cached_result(images[i][1], result, persist=False)
+        return results
 
 
 class ChatGPTVisionAnalyzer(ImageAnalyzer):
@@ -255,22 +961,28 @@ class ChatGPTVisionAnalyzer(ImageAnalyzer):
     def __init__(self):
         super().__init__()
         
+        # 요청마다 다시 만들지 않도록 시스템 메시지를 미리 구성
+        self.system_message = {
+            "role": "system",
+            "content": f"당신은 이미지를 분석하여 필요한 정보를 추출하는 전문가입니다. 다음 지시에 따라 이미지를 분석해주세요: {self.prompt}"
+        }
+        
         # ChatGPT API 클라이언트 초기화
         try:
             api_key_path = 'chatgpt-api-key/chatgpt_api_key.txt'
             
-            # 키 파일 존재 확인
-            if not os.path.exists(api_key_path):
+            # 키 파일 로드 (프로세스당 한 번만 읽음)
+            try:
+                api_key = load_api_key(api_key_path)
+            except FileNotFoundError:
                 raise FileNotFoundError(f"ChatGPT API 키 파일을 찾을 수 없습니다: {api_key_path}")
                 
-            with open(api_key_path, 'r') as f:
-                api_key = f.read().strip()
-                
             # API 키가 비어있는지 확인
             if not api_key:
                 raise ValueError("ChatGPT API 키가 비어 있습니다.")
                 
-            self.openai_client = OpenAI(api_key=api_key)
+            self.openai_client = get_openai_client(api_key)
+            self.model_name = "gpt-4o"
         except FileNotFoundError as e:
             raise e
         except ValueError as e:
@@ -289,92 +1001,137 @@ class ChatGPTVisionAnalyzer(ImageAnalyzer):
             str: 이미지에서 추출된 정보
         """
         max_retries = 3
-        retry_count = 0
+        base_delay = 1  # 기본 대기 시간 (초)
         
-        while retry_count < max_retries:
-            try:
-                # 파일 존재 확인
-                abs_path = self.check_file_exists(image_path)
-                if not abs_path:
-                    return None
-                    
-                # 이미지 파일 크기 제한 확인 (ChatGPT Vision API의 파일 크기 제한)
-                try:
-                    file_size = os.path.getsize(abs_path)
-                    max_size = 20 * 1024 * 1024  # 20MB
-                    if file_size > max_size:
-                        return None  # 파일이 너무 큼
-                except Exception:
-                    return None
-                    
-                # 이미지를 base64로 인코딩
-                try:
-                    with open(abs_path, "rb") as image_file:
-                        base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-                except PermissionError:
-                    return None
-                except Exception:
-                    return None
-                
-                # ChatGPT Vision API 호출
-                try:
-                    response = self.openai_client.chat.completions.create(
-                        model="gpt-4o",
-                        messages=[
-                            {
-                                "role": "system",
-                                "content": f"당신은 이미지를 분석하여 필요한 정보를 추출하는 전문가입니다. 다음 지시에 따라 이미지를 분석해주세요: {self.prompt}"
-                            },
-                            {
-                                "role": "user",
-                                "content": [
-                                    {"type": "text", "text": "이 이미지를 분석해서 요청한 정보를 추출해주세요."},
-                                    {
-                                        "type": "image_url",
-                                        "image_url": {
-                                            "url": f"data:image/jpeg;base64,{base64_image}"
-                                        }
-                                    }
-                                ]
-                            }
-                        ],
-                        temperature=0.3,
-                        max_tokens=100
-                    )
-                    
-                    if response and hasattr(response, 'choices') and len(response.choices) > 0:
-                        extracted_info = response.choices[0].message.content.strip()
-                        return extracted_info
-                    else:
-                        # API 응답 오류 재시도
-                        retry_count += 1
-                        if retry_count < max_retries:
-                            time.sleep(1)  # 1초 대기 후 재시도
-                            continue
-                        return None
-                except requests.exceptions.RequestException:
-                    # 네트워크 오류 재시도
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        time.sleep(2)  # 2초 대기 후 재시도
-                        continue
-                    return None
-                except Exception:
-                    # 기타 오류 재시도
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        time.sleep(1)  # 1초 대기 후 재시도
-                        continue
-                    return None
-                
-            except Exception:
-                retry_count += 1
-                if retry_count < max_retries:
-                    time.sleep(1)  # 1초 대기 후 재시도
-                    continue
-                return None
+        # 파일 존재 확인
+        abs_path = self.check_file_exists(image_path)
+        if not abs_path:
+            return None
+            
+        # 이미지 로드 및 크기 제한 확인 (ChatGPT Vision API의 파일 크기 제한, 재시도 시에도 같은 데이터를 재사용)
+        try:
+            image_data = self.read_image_file(abs_path, 20 * 1024 * 1024)  # 20MB
+            if image_data is None:
+                return None  # 파일이 너무 큼
+        except PermissionError:
+            return None
+        except Exception:
+            return None
         
-        return None
+        # 동일한 이미지의 이전 분석 결과가 있으면 API 호출 생략
+        cache_key = self.get_cache_key(image_data)
+        cached_result = self.get_cached_result(cache_key)
+        if cached_result is not None:
+            return cached_result
+        
+        upload_data, mime_type = prepare_for_upload(image_data, self.get_mime_type(abs_path, image_data))
+        data_url = to_data_url(upload_data, mime_type)
+        
+        # ChatGPT Vision API 호출 (같은 이미지를 분석 중인 요청이 있으면 그 결과를 함께 사용)
+        return self.run_single_flight(
+            cache_key, lambda: call_with_retry(
+                lambda: self.request_analysis(data_url), max_retries, base_delay,
+                deadline=time.monotonic() + self.MAX_ANALYSIS_SECONDS
+            )
+        )
+
+    def request_analysis(self, data_url):
+        """
+        ChatGPT Vision API로 이미지 분석 1회 요청
+
+        Args:
+            data_url (str): base64로 인코딩된 이미지 data URL
+
+        Returns:
+            str: 이미지에서 추출된 정보
+        """
+        response = self.openai_client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                self.system_message,
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": "이 이미지를 분석해서 요청한 정보를 추출해주세요."},
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": data_url
+                            }
+                        }
+                    ]
+                }
+            ],
+            temperature=0.3,
+            max_tokens=100
+        )
+
+        try:
+            return response.choices[0].message.content.strip()
+        except (AttributeError, IndexError):
+            raise ValueError("유효하지 않은 응답 형식입니다.")
+
+    def analyze_image_batch(self, image_paths):
+        """
+        ChatGPT Vision API로 여러 이미지를 한 번의 요청으로 분석
+
+        Args:
+            image_paths (list): 이미지 파일 경로 리스트 (최대 MAX_BATCH_SIZE개)
+
+        Returns:
+            list or None: 이미지 순서대로의 추출 정보 리스트 또는 None (실패 시 개별 분석으로 대체)
+        """
+        images = self.load_batch_images(image_paths, 20 * 1024 * 1024)  # 20MB
+        if images is None:
+            return None
+
+        # 캐시에 없는 이미지만 요청에 포함
+        results = [cached_result for _, _, _, cached_result in images]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        image_contents = []
+        for i in pending:
+            upload_data, mime_type = prepare_for_upload(images[i][2], self.get_mime_type(images[i][0], images[i][2]))
+            image_contents.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": to_data_url(upload_data, mime_type)
+                }
+            })
+
+        # ChatGPT Vision API 호출 (모든 이미지를 하나의 요청으로 전송)
+        try:
+            with api_request_slot():
+                response = self.openai_client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        self.system_message,
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": self.get_batch_instruction(len(image_contents))}
+                            ] + image_contents
+                        }
+                    ],
+                    temperature=0.3,
+                    max_tokens=100 * len(image_contents)
+                )
+
+            batch_results = self.parse_batch_results(response.choices[0].message.content, len(pending))
+        except Exception:
+            return None
+
+        if batch_results is None:
+            return None
+
+        for i, result in zip(pending, batch_results):
+            results[i] = result
+            # 일괄 분석 결과는 형식에 맞는 것만 이번 실행 동안 메모리에만 캐시 (영구 캐시에는 저장하지 않음)
+            if is_valid_result(result):
+                self.store_cached_result(images[i][1], result, persist=False)
+        return results
 
 
 class GeminiAnalyzer(ImageAnalyzer):
@@ -383,30 +1140,30 @@ class GeminiAnalyzer(ImageAnalyzer):
     def __init__(self):
         super().__init__()
         
+        # 요청마다 다시 만들지 않도록 프롬프트 문자열을 미리 구성
+        self.image_prompt = f"다음 지시에 따라 이미지를 분석해주세요: {self.prompt}\n이미지를 분석하고 요청된 정보만 추출해주세요."
+        self.batch_prompt = f"다음 지시에 따라 이미지를 분석해주세요: {self.prompt}\n"
+        
         # Gemini API 초기화
         try:
             api_key_path = 'gemini-api-key/gemini-api-key.txt'
             
-            # 키 파일 존재 확인
-            if not os.path.exists(api_key_path):
+            # 키 파일 로드 (프로세스당 한 번만 읽음)
+            try:
+                api_key = load_api_key(api_key_path)
+            except FileNotFoundError:
                 raise FileNotFoundError(f"Gemini API 키 파일을 찾을 수 없습니다: {api_key_path}")
                 
-            with open(api_key_path, 'r') as f:
-                api_key = f.read().strip()
-                
             # API 키가 비어있는지 확인
             if not api_key:
                 raise ValueError("Gemini API 키가 비어 있습니다.")
                 
             genai.configure(api_key=api_key)
             
-            # 모델 존재 확인
-            available_models = [m.name for m in genai.list_models()]
-            if 'gemini-2.0-flash-lite' not in available_models and 'models/gemini-2.0-flash-lite' not in available_models:
-                model_name = 'gemini-1.5-flash'  # 대체 모델
-                self.model = genai.GenerativeModel(model_name)
-            else:
-                self.model = genai.GenerativeModel('gemini-2.0-flash-lite')
+            # 모델 존재 확인 (조회 결과와 모델 객체는 캐시되어 재생성 시 네트워크 요청 없음)
+            self.model_name = resolve_gemini_model_name()
+            api_key_hash = hashlib.blake2b(api_key.encode('utf-8'), digest_size=16).hexdigest()
+            self.model = get_gemini_model(self.model_name, api_key_hash)
                 
         except FileNotFoundError as e:
             raise e
@@ -415,6 +1172,54 @@ class GeminiAnalyzer(ImageAnalyzer):
         except Exception as e:
             raise Exception(f"Gemini API 초기화 중 오류: {str(e)}")
     
+    def analyze_image_batch(self, image_paths):
+        """
+        Gemini API로 여러 이미지를 한 번의 요청으로 분석
+        
+        Args:
+            image_paths (list): 이미지 파일 경로 리스트 (최대 MAX_BATCH_SIZE개)
+        
+        Returns:
+            list or None: 이미지 순서대로의 추출 정보 리스트 또는 None (실패 시 개별 분석으로 대체)
+        """
+        images = self.load_batch_images(image_paths, 10 * 1024 * 1024)  # 10MB
+        if images is None:
+            return None
+        
+        # 캐시에 없는 이미지만 요청에 포함
+        results = [cached_result for _, _, _, cached_result in images]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        
+        image_parts = []
+        for i in pending:
+            upload_data, mime_type = prepare_for_upload(images[i][2], self.get_mime_type(images[i][0], images[i][2]))
+            image_parts.append({"mime_type": mime_type, "data": upload_data})
+        
+        prompt = self.batch_prompt + self.get_batch_instruction(len(image_parts))
+        
+        try:
+            print(f"  ✓ Gemini API 일괄 요청 중... ({len(image_parts)}개 이미지)")
+            with api_request_slot():
+                response = self.model.generate_content(
+                    contents=[prompt] + image_parts,
+                    request_options={"timeout": API_REQUEST_TIMEOUT}
+                )
+            batch_results = self.parse_batch_results(response.text, len(pending))
+        except Exception:
+            return None
+        
+        if batch_results is None:
+            return None
+        
+        for i, result in zip(pending, batch_results):
+            results[i] = result
+            # 일괄 분석 결과는 형식에 맞는 것만 이번 실행 동안 메모리에만 캐시 (영구 캐시에는 저장하지 않음)
+            if is_valid_result(result):
+                self.store_cached_result(images[i][1], result, persist=False)
+        return results
+    
     def analyze_image(self, image_path):
         """
         Gemini API로 이미지 직접 분석
@@ -426,106 +1231,69 @@ class GeminiAnalyzer(ImageAnalyzer):
             str: 이미지에서 추출된 정보
         """
         max_retries = 5  # 최대 재시도 횟수를 3에서 5로 증가
-        retry_count = 0
         base_delay = 2  # 기본 대기 시간 (초)
         
-        while retry_count < max_retries:
-            try:
-                # 파일 존재 확인
-                abs_path = self.check_file_exists(image_path)
-                if not abs_path:
-                    print(f"❌ [Gemini API 오류] 유효하지 않은 이미지 파일: {image_path}")
-                    return None
-                
-                # 이미지 파일 크기 제한 확인 (Gemini API의 파일 크기 제한)
-                try:
-                    file_size = os.path.getsize(abs_path)
-                    max_size = 10 * 1024 * 1024  # 10MB
-                    if file_size > max_size:
-                        print(f"❌ [Gemini API 오류] 이미지 파일이 너무 큽니다 ({file_size/1024/1024:.2f}MB > 10MB)")
-                        return None  # 파일이 너무 큼
-                except Exception as e:
-                    print(f"❌ [Gemini API 오류] 파일 크기 확인 중 오류: {str(e)}")
-                    return None
-                
-                # 이미지 로드
-                try:
-                    with open(abs_path, "rb") as image_file:
-                        image_data = image_file.read()
-                except PermissionError as e:
-                    print(f"❌ [Gemini API 오류] 파일 접근 권한이 없습니다: {str(e)}")
-                    return None
-                except Exception as e:
-                    print(f"❌ [Gemini API 오류] 이미지 로드 중 오류: {str(e)}")
-                    return None
-                
-                # MIME 타입 결정
-                _, ext = os.path.splitext(abs_path)
-                mime_type = "image/jpeg"  # 기본값
-                if ext.lower() == '.png':
-                    mime_type = "image/png"
-                elif ext.lower() in ['.gif']:
-                    mime_type = "image/gif"
-                elif ext.lower() in ['.webp']:
-                    mime_type = "image/webp"
-                elif ext.lower() in ['.bmp']:
-                    mime_type = "image/bmp"
-                
-                image_parts = [
-                    {
-                        "mime_type": mime_type,
-                        "data": image_data
-                    }
-                ]
-                
-                # 지수 백오프 적용 (재시도마다 대기 시간 증가)
-                if retry_count > 0:
-                    # 2^n 공식 적용 (2, 4, 8, 16, 32초...)
-                    current_delay = base_delay * (2 ** (retry_count - 1))
-                    # 약간의 랜덤성 추가 (지터)
-                    jitter = random.uniform(0.8, 1.2)
-                    delay_with_jitter = current_delay * jitter
-                    
-                    print(f"  ⚠️ [Gemini API 재시도] {retry_count}/{max_retries} (대기: {delay_with_jitter:.2f}초)")
-                    time.sleep(delay_with_jitter)
-                
-                # Gemini에 프롬프트와 함께 전송
-                prompt = f"다음 지시에 따라 이미지를 분석해주세요: {self.prompt}\n이미지를 분석하고 요청된 정보만 추출해주세요."
-                
-                try:
-                    print(f"  ✓ Gemini API 요청 중...")
-                    response = self.model.generate_content(
-                        contents=[prompt, image_parts[0]]
-                    )
-                    
-                    if response and hasattr(response, 'text'):
-                        extracted_info = response.text.strip()
-                        print(f"  ✓ [Gemini API 요청 성공] 결과를 받았습니다.")
-                        return extracted_info
-                    else:
-                        # API 응답 오류 재시도
-                        retry_count += 1
-                        print(f"❌ [Gemini API 오류] 유효하지 않은 응답 형식")
-                        continue
-                except requests.exceptions.RequestException as e:
-                    # 네트워크 오류 재시도
-                    retry_count += 1
-                    print(f"❌ [Gemini API 오류] 네트워크 요청 실패: {str(e)}")
-                    continue
-                except Exception as e:
-                    # 모델 호출 오류 확인 및 재시도
-                    retry_count += 1
-                    print(f"❌ [Gemini API 오류] API 호출 중 오류: {str(e)}")
-                    
-                    # 429 에러 감지 (Too Many Requests)
-                    if "429" in str(e) or "rate limit" in str(e).lower() or "too many requests" in str(e).lower():
-                        print(f"⚠️ [Gemini API 오류] 요청 한도 초과 (Rate Limit) - 지수 백오프 적용 중...")
-                    continue
-                
-            except Exception as e:
-                retry_count += 1
-                print(f"❌ [Gemini API 오류] 예상치 못한 오류 발생: {str(e)}")
-                continue
+        # 파일 존재 확인
+        abs_path = self.check_file_exists(image_path)
+        if not abs_path:
+            print(f"❌ [Gemini API 오류] 유효하지 않은 이미지 파일: {image_path}")
+            return None
+        
+        # 이미지 로드 및 크기 제한 확인 (Gemini API의 파일 크기 제한, 재시도 시에도 같은 데이터를 재사용)
+        try:
+            image_data = self.read_image_file(abs_path, 10 * 1024 * 1024)  # 10MB
+            if image_data is None:
+                print(f"❌ [Gemini API 오류] 이미지 파일이 너무 큽니다 (10MB 초과)")
+                return None  # 파일이 너무 큼
+        except PermissionError as e:
+            print(f"❌ [Gemini API 오류] 파일 접근 권한이 없습니다: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"❌ [Gemini API 오류] 이미지 로드 중 오류: {str(e)}")
+            return None
+        
+        # 동일한 이미지의 이전 분석 결과가 있으면 API 호출 생략
+        cache_key = self.get_cache_key(image_data)
+        cached_result = self.get_cached_result(cache_key)
+        if cached_result is not None:
+            print(f"  ✓ [캐시] 이전 분석 결과를 사용합니다.")
+            return cached_result
+        
+        upload_data, mime_type = prepare_for_upload(image_data, self.get_mime_type(abs_path, image_data))
+        image_part = {
+            "mime_type": mime_type,
+            "data": upload_data
+        }
+        
+        # 같은 이미지를 분석 중인 요청이 있으면 그 결과를 함께 사용
+        return self.run_single_flight(
+            cache_key, lambda: call_with_retry(
+                lambda: self.request_analysis(image_part), max_retries, base_delay, "Gemini API",
+                time.monotonic() + self.MAX_ANALYSIS_SECONDS
+            )
+        )
+    
+    def request_analysis(self, image_part):
+        """
+        Gemini API로 이미지 분석 1회 요청
+        
+        Args:
+            image_part (dict): MIME 타입과 이미지 데이터
+        
+        Returns:
+            str: 이미지에서 추출된 정보
+        """
+        # Gemini에 프롬프트와 함께 전송
+        print(f"  ✓ Gemini API 요청 중...")
+        response = self.model.generate_content(
+            contents=[self.image_prompt, image_part],
+            request_options={"timeout": API_REQUEST_TIMEOUT}
+        )
+        
+        try:
+            extracted_info = response.text.strip()
+        except AttributeError:
+            raise ValueError("유효하지 않은 응답 형식")
         
-        print(f"❌ [Gemini API 오류] 최대 재시도 횟수({max_retries}회)를 초과했습니다. 분석에 실패했습니다.")
-        return None
\ No newline at end of file
+        print(f"  ✓ [Gemini API 요청 성공] 결과를 받았습니다.")
+        return extracted_info
\ No newline at end of file
@@ -3,51 +3,71 @@
 
 import os
 import argparse
+import asyncio
 import sys
 import re
 import shutil
 import time
+import threading
+import contextvars
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from video_processor import VideoProcessor
 from image_analyzer import GoogleVisionAnalyzer, ChatGPTVisionAnalyzer, GeminiAnalyzer
+from image_analyzer import VALID_FORMAT_PATTERN, set_persistent_cache_enabled, clear_result_cache
 
+# 추출 정보 검사용 정규식 (모듈 로드 시 한 번만 컴파일, 형식 정규식은 캐시 저장 조건과 공유)
+# [0동], [01동], [02호] 등과 같은 패턴
+ZERO_PREFIX_PATTERN = re.compile(r'\[0\d*동\]|\[\d*0\d*호\]')
+
+# 같은 비디오의 프레임들은 동일한 추출 정보를 반복해서 반환하므로 검사 결과를 캐시
+@lru_cache(maxsize=1024)
 def is_valid_format(extracted_info):
     """추출 정보가 '[~동] [~호] [배관종류] [배관명]' 형식인지 확인"""
-    pattern = r'\[\S+동\] \[\S+호\] \[\S+\] \[\S+\]'
-    return bool(re.match(pattern, extracted_info))
+    return VALID_FORMAT_PATTERN.match(extracted_info) is not None
 
+@lru_cache(maxsize=1024)
 def has_zero_prefix(extracted_info):
     """동, 호 정보가 0으로 시작하는지 확인"""
-    # [0동], [01동], [02호] 등과 같은 패턴 찾기
-    pattern = r'\[0\d*동\]|\[\d*0\d*호\]'
-    return bool(re.search(pattern, extracted_info))
+    return ZERO_PREFIX_PATTERN.search(extracted_info) is not None
 
+@lru_cache(maxsize=1024)
 def has_no_spaces(extracted_info):
     """텍스트에 띄어쓰기가 없는지 확인 (대괄호 사이의 공백 제외)"""
-    # 대괄호 사이의 공백을 임시로 다른 문자로 치환
-    temp_text = re.sub(r'\] \[', ']#[', extracted_info)
-    # 남은 공백이 있는지 확인
-    return ' ' not in temp_text
+    # 대괄호 사이의 공백을 임시로 다른 문자로 치환한 뒤 남은 공백이 있는지 확인
+    return extracted_info.replace('] [', ']#[').find(' ') == -1
+
+def remove_tree(directory, on_error):
+    """
+    디렉토리를 통째로 삭제하고, 삭제하지 못한 항목마다 on_error(경로, 예외) 호출
+    
+    Python 3.12부터 onerror가 폐지 예정이므로 가능한 경우 onexc를 사용한다.
+    """
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(directory, onexc=lambda func, path, error: on_error(path, error))
+    else:
+        shutil.rmtree(directory, onerror=lambda func, path, exc_info: on_error(path, exc_info[1]))
 
 def clear_directory(directory):
-    """디렉토리 내용을 모두 삭제"""
+    """디렉토리 내용을 모두 삭제 (디렉토리를 통째로 지운 뒤 다시 생성, 남은 항목이 있으면 False)"""
     if os.path.exists(directory):
+        failed_paths = []
+        
+        def on_error(path, error):
+            if isinstance(error, FileNotFoundError):
+                # 이미 삭제된 파일인 경우 무시
+                return
+            failed_paths.append(path)
+            if isinstance(error, PermissionError):
+                print(f"  ❌ 권한 오류: {path} 접근이 거부되었습니다.")
+            else:
+                print(f"  ❌ 파일 삭제 실패: {path}")
+        
         try:
-            for item in os.listdir(directory):
-                item_path = os.path.join(directory, item)
-                try:
-                    if os.path.isfile(item_path):
-                        os.unlink(item_path)
-                    elif os.path.isdir(item_path):
-                        shutil.rmtree(item_path)
-                except PermissionError:
-                    print(f"  ❌ 권한 오류: {item_path} 접근이 거부되었습니다.")
-                except FileNotFoundError:
-                    # 이미 삭제된 파일인 경우 무시
-                    pass
-                except Exception as e:
-                    print(f"  ❌ 파일 삭제 실패: {item_path}")
-            return True
+            remove_tree(directory, on_error)
+            os.makedirs(directory, exist_ok=True)
+            return not failed_paths
         except PermissionError:
             print(f"  ❌ 폴더 접근 권한이 없습니다: {directory}")
         except Exception as e:
@@ -92,48 +112,101 @@ def select_best_result(results):
     if not results:
         return None
     
-    # 유효한 형식인지 검사
-    valid_format_results = [r for r in results if is_valid_format(r["extracted_info"])]
+    # 유효한 형식의 결과만 (결과, 추출 정보) 쌍으로 한 번에 수집
+    # (결과 생성 시 저장된 "valid_format" 값이 있으면 정규식 검사를 다시 하지 않음)
+    valid = []
+    for r in results:
+        info = r["extracted_info"]
+        valid_format = r.get("valid_format")
+        if valid_format is None:
+            valid_format = is_valid_format(info)
+        if valid_format:
+            valid.append((r, info))
     
-    # 유효한 형식의 결과가 없으면 원래 결과 사용
-    if not valid_format_results:
-        # 원래 결과도 없으면 None 반환
-        if not results:
-            return None
-        # 모든 결과가 유효하지 않은 형식이면 원래 결과 중 첫 번째 사용
+    # 모든 결과가 유효하지 않은 형식이면 원래 결과 중 첫 번째 사용
+    if not valid:
         return results[0]
     
-    # 이후 분석은 유효한 형식의 결과만 대상으로 함
-    results = valid_format_results
+    # 0으로 시작하는 동, 호 정보가 있는 결과 제외 (모두 해당되면 유효한 결과 전체 사용)
+    filtered = [x for x in valid if not has_zero_prefix(x[1])] or valid
     
-    # 1. 정보가 있는 것 (이미 results에 포함된 항목은 모두 정보가 있음)
+    # 다수결 - 가장 많이 나온 결과 텍스트 선택
+    top = Counter(info for _, info in filtered).most_common(1)[0][0]
     
-    # 2. 0으로 시작하는 동, 호 정보가 있는 결과 제외
-    valid_results = [r for r in results if not has_zero_prefix(r["extracted_info"])]
+    # 띄어쓰기가 없는 결과 우선, 없으면 가장 많이 나온 결과 중 첫 번째 것 선택
+    first_match = None
+    for r, info in filtered:
+        if info != top:
+            continue
+        if has_no_spaces(info):
+            return r
+        if first_match is None:
+            first_match = r
+    return first_match
+
+# 병렬 처리 중인 비디오의 출력을 모아 두는 버퍼 (None이면 바로 출력)
+# asyncio.to_thread 등으로 만든 하위 작업에도 컨텍스트가 전달되어 같은 버퍼에 기록됨
+_output_buffer = contextvars.ContextVar('output_buffer', default=None)
+_output_lock = threading.Lock()
+
+class BufferedStdout:
+    """현재 컨텍스트에 버퍼가 있으면 출력을 모아 두고, 없으면 원래 stdout으로 바로 출력"""
     
-    # 유효한 결과가 없으면 원래 결과 사용
-    if not valid_results:
-        valid_results = results
+    def __init__(self, stream):
+        self.stream = stream
     
-    # 3. 다수결 - 가장 많이 나온 결과를 선택
-    # 결과 텍스트별 빈도수 계산
-    result_counter = Counter([r["extracted_info"] for r in valid_results])
+    def write(self, text):
+        buffer = _output_buffer.get()
+        if buffer is None:
+            return self.stream.write(text)
+        buffer.append(text)
+        return len(text)
     
-    # 가장 많이 나온 결과 찾기
-    most_common_results = result_counter.most_common()
+    def flush(self):
+        if _output_buffer.get() is None:
+            self.stream.flush()
     
-    # 가장 많이 나온 결과에 해당하는 항목들
-    most_common_items = [r for r in valid_results if r["extracted_info"] == most_common_results[0][0]]
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+def process_videos_parallel(process_video, video_files, workers):
+    """
+    여러 비디오를 동시에 처리하고 비디오 목록 순서대로 결과 반환
     
-    # 4. 띄어쓰기가 없는 결과 우선
-    no_space_results = [r for r in most_common_items if has_no_spaces(r["extracted_info"])]
+    비디오별 출력은 모아 두었다가 해당 비디오 처리가 끝나면 한 번에 출력한다.
+    Ctrl+C로 중단하면 아직 시작하지 않은 비디오는 취소한다.
     
-    # 띄어쓰기가 없는 결과가 있으면 해당 결과 중 첫 번째 것 선택
-    if no_space_results:
-        return no_space_results[0]
+    Args:
+        process_video (callable): (순번, 비디오 파일명)을 받아 최상의 결과를 반환하는 함수
+        video_files (list): 비디오 파일명 리스트
+        workers (int): 동시에 처리할 비디오 수
     
-    # 없으면 가장 많이 나온 결과 중 첫 번째 것 선택
-    return most_common_items[0]
+    Returns:
+        list: 비디오 순서대로의 결과 리스트 (실패한 비디오는 None)
+    """
+    def run_buffered(idx, video_file):
+        buffer = []
+        token = _output_buffer.set(buffer)
+        try:
+            return process_video(idx, video_file)
+        finally:
+            _output_buffer.reset(token)
+            with _output_lock:
+                sys.stdout.write("".join(buffer))
+                sys.stdout.flush()
+    
+    original_stdout = sys.stdout
+    sys.stdout = BufferedStdout(original_stdout)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        return list(executor.map(run_buffered, range(1, len(video_files) + 1), video_files))
+    except KeyboardInterrupt:
+        # 대기 중인 비디오는 취소 (이미 처리 중인 비디오만 마무리됨)
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        executor.shutdown(wait=False)
+        sys.stdout = original_stdout
 
 def is_valid_video_file(file_path):
     """비디오 파일 유효성 검사 (확장자만으로 판단)"""
@@ -167,8 +240,21 @@ def main():
         parser.add_argument('--debug', action='store_true', help='디버그 정보 출력')
         parser.add_argument('--verbose', action='store_true', help='상세 로그 출력')
         parser.add_argument('--retry', type=int, default=3, help='API 호출 실패 시 재시도 횟수 (기본값: 3)')
+        parser.add_argument('--workers', type=int, default=1,
+                        help='동시에 처리할 비디오 수 (기본값: 1, 2 이상이면 비디오별 출력을 모아서 표시)')
+        parser.add_argument('--no-cache', action='store_true',
+                        help='이전 실행에서 저장된 분석 결과를 사용하지 않고 새로 분석')
+        parser.add_argument('--clear-cache', action='store_true',
+                        help='시작 전에 저장된 분석 결과 캐시를 모두 삭제')
         args = parser.parse_args()
 
+        # 분석 결과 캐시 설정
+        if args.clear_cache:
+            clear_result_cache()
+            print("✓ 분석 결과 캐시를 삭제했습니다.")
+        if args.no_cache:
+            set_persistent_cache_enabled(False)
+
         # API 키 확인
         missing_keys = check_api_keys()
         if missing_keys:
@@ -206,20 +292,25 @@ def main():
         # 결과 디렉토리 생성
         output_dir_abs = os.path.abspath(args.output_dir)
         
-        # 결과 폴더 내용 삭제
+        # 결과 폴더 내용 삭제 (clear_directory가 폴더를 다시 생성함)
         if os.path.exists(output_dir_abs):
             print(f"\n✓ 결과 폴더 초기화")
-            clear_directory(output_dir_abs)
-        
-        # 결과 디렉토리가 없으면 생성
-        try:
-            os.makedirs(output_dir_abs, exist_ok=True)
-        except PermissionError:
-            print(f"❌ 결과 디렉토리 생성 권한이 없습니다: {output_dir_abs}")
-            return
-        except Exception as e:
-            print(f"❌ 결과 디렉토리 생성 중 오류: {str(e)}")
-            return
+            if not clear_directory(output_dir_abs):
+                # 폴더를 다시 만들지 못했으면 중단, 일부 파일만 남은 경우에는 경고 후 계속 진행
+                if not os.path.isdir(output_dir_abs):
+                    print(f"❌ 결과 디렉토리를 다시 생성하지 못했습니다: {output_dir_abs}")
+                    return
+                print(f"⚠️ 결과 폴더에 삭제하지 못한 파일이 남아 있습니다: {output_dir_abs}")
+        else:
+            # 결과 디렉토리가 없으면 생성
+            try:
+                os.makedirs(output_dir_abs, exist_ok=True)
+            except PermissionError:
+                print(f"❌ 결과 디렉토리 생성 권한이 없습니다: {output_dir_abs}")
+                return
+            except Exception as e:
+                print(f"❌ 결과 디렉토리 생성 중 오류: {str(e)}")
+                return
         
         # 간략한 설정 정보 출력
         print("\n✓ 분석 설정")
@@ -250,8 +341,11 @@ def main():
             
             # 모든 비디오 파일 처리
             try:
-                all_files = os.listdir(video_dir_abs)
-                video_files = [f for f in all_files if f.lower().endswith(('.mp4', '.avi', '.mkv', '.mov'))]
+                with os.scandir(video_dir_abs) as entries:
+                    video_files = [
+                        entry.name for entry in entries
+                        if entry.is_file() and entry.name.lower().endswith(('.mp4', '.avi', '.mkv', '.mov'))
+                    ]
                 
                 if not video_files:
                     print(f"\n❌ 비디오 파일이 없습니다.")
@@ -270,10 +364,8 @@ def main():
                     print(f"\n❌ 유효한 비디오 파일이 없습니다.")
                     return
                     
-                # 동영상별 최상의 결과를 저장할 리스트
-                best_results = []
-                
-                for idx, video_file in enumerate(valid_video_files, 1):
+                def process_video(idx, video_file):
+                    """비디오 한 개의 프레임 추출, 분석 후 최상의 결과 반환 (실패 시 None)"""
                     print(f"\n[{idx}/{len(valid_video_files)}] {video_file}")
                     
                     # 비디오 처리 중 오류 발생 시 다음 비디오로 계속 진행
@@ -283,20 +375,19 @@ def main():
                         
                         if not frame_paths:
                             print(f"  ❌ 프레임 추출 실패")
-                            continue
+                            return None
                         
                         # 현재 비디오의 결과 저장
                         video_results = []
                         
-                        # 각 프레임 분석 시 재시도 로직 추가
-                        for frame_path in frame_paths:
-                            # 파일 존재 확인
-                            if not os.path.exists(frame_path):
-                                continue
-                            
+                        # 첫 번째 분석은 모든 프레임을 동시에 요청
+                        frame_paths = [frame_path for frame_path in frame_paths if os.path.exists(frame_path)]
+                        initial_results = asyncio.run(analyzer.analyze_images_async(frame_paths))
+                        
+                        # 실패한 프레임만 재시도
+                        for frame_path, extracted_info in zip(frame_paths, initial_results):
                             # 분석 시도 (재시도 로직 포함)
-                            retry_count = 0
-                            extracted_info = None
+                            retry_count = 1
                             
                             while retry_count < args.retry and extracted_info is None:
                                 if retry_count > 0:
@@ -311,21 +402,21 @@ def main():
                                     retry_count += 1
                                     continue
                                 
-                                # 유효한 형식인지 확인
-                                if extracted_info and not is_valid_format(extracted_info):
-                                    if args.debug:
-                                        print(f"  ⚠️ 유효하지 않은 형식: {extracted_info}")
-                                    # 재시도 횟수는 증가시키지만 None으로 설정하지는 않음
-                                
                                 retry_count += 1
                             
                             if extracted_info:
+                                # 유효한 형식인지 한 번만 확인하여 결과에 함께 저장
+                                valid_format = is_valid_format(extracted_info)
+                                if not valid_format and args.debug:
+                                    print(f"  ⚠️ 유효하지 않은 형식: {extracted_info}")
+                                
                                 # 결과 저장
                                 result = {
                                     "video_file": video_file,
                                     "image_path": frame_path,
                                     "extracted_info": extracted_info,
-                                    "suggested_filename": extracted_info
+                                    "suggested_filename": extracted_info,
+                                    "valid_format": valid_format
                                 }
                                 video_results.append(result)
                         
@@ -334,10 +425,9 @@ def main():
                             try:
                                 best_result = select_best_result(video_results)
                                 if best_result:
-                                    best_results.append(best_result)
                                     print(f"  ✓ 결과: {best_result['extracted_info']}")
-                                else:
-                                    print(f"  ⚠️ 최적 결과 선택 실패")
+                                    return best_result
+                                print(f"  ⚠️ 최적 결과 선택 실패")
                             except Exception as e:
                                 print(f"  ❌ 결과 선택 중 오류: {str(e)}")
                         else:
@@ -345,7 +435,16 @@ def main():
                     
                     except Exception as e:
                         print(f"  ❌ 비디오 처리 중 오류: {str(e)}")
-                        continue
+                    return None
+                
+                workers = max(1, min(args.workers, len(valid_video_files)))
+                if workers == 1:
+                    results = [process_video(idx, video_file) for idx, video_file in enumerate(valid_video_files, 1)]
+                else:
+                    results = process_videos_parallel(process_video, valid_video_files, workers)
+                
+                # 동영상별 최상의 결과를 저장할 리스트
+                best_results = [result for result in results if result]
                 
                 # 최종 결과 요약
                 print("\n[ 최종 결과 ]")
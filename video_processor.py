@@ -2,13 +2,136 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
 import cv2
-from datetime import datetime
-import shutil
-import numpy as np
-from PIL import Image
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 import time
 
+# 다음 추출 위치가 현재 디코더 위치보다 이 프레임 수 이내로 앞에 있으면
+# 탐색(seek) 대신 grab()으로 순차 디코딩하여 키프레임부터 다시 디코딩하는 것을 피함
+MAX_SEQUENTIAL_GRAB = 60
+
+# 검은 프레임 판별 시 가로/세로 픽셀 샘플링 간격
+BLACK_FRAME_SAMPLE_STRIDE = 32
+
+# 프레임 저장 시 JPEG 인코딩 옵션
+JPEG_ENCODE_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 90, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+
+# 파일명에 사용할 수 없는 문자 (\ / : * ? " < > |)
+INVALID_FILENAME_PATTERN = re.compile(r'[\\/:*?"<>|]')
+
+# 프레임 저장에 사용할 최대 스레드 수
+MAX_SAVE_WORKERS = min(4, os.cpu_count() or 1)
+
+@functools.lru_cache(maxsize=1)
+def get_save_executor():
+    """프레임 저장용 스레드 풀 (모든 추출 작업에서 공유)"""
+    return ThreadPoolExecutor(max_workers=MAX_SAVE_WORKERS)
+
+def retry_until_success(action, attempts=3, delay=0.1, give_up=None):
+    """
+    action이 None 또는 False가 아닌 값을 반환할 때까지 지수 백오프로 재시도
+    
+    Args:
+        action (callable): 실행할 함수 (실패 시 None/False 반환 또는 예외 발생)
+        attempts (int): 최대 시도 횟수
+        delay (float): 첫 재시도 전 대기 시간(초), 이후 두 배씩 증가
+        give_up (callable): 실패 후 호출하여 True이면 재시도해도 소용없는 영구 실패로 보고 즉시 중단
+    
+    Returns:
+        action의 반환값 (모든 시도 실패 시 None 또는 False)
+    """
+    result = None
+    for attempt in range(attempts):
+        try:
+            result = action()
+            # 프레임(numpy 배열)은 진리값 판정이 불가능하므로 None/False와 동일성으로 비교
+            if result is not None and result is not False:
+                return result
+        except Exception:
+            result = None
+        if give_up is not None and give_up():
+            break
+        if attempt < attempts - 1:
+            time.sleep(delay * (2 ** attempt))  # 잠시 대기 후 재시도
+    return result
+
+def seek_to_frame(video, frame_number):
+    """지정 프레임으로 이동 (set()이 실패를 반환해도 실제 위치가 목표와 같으면 성공으로 간주)"""
+    return video.set(cv2.CAP_PROP_POS_FRAMES, frame_number) or int(video.get(cv2.CAP_PROP_POS_FRAMES)) == frame_number
+
+def read_frame(video):
+    """다음 프레임을 읽어 반환 (실패 시 None)"""
+    success, frame = video.read()
+    return frame if success else None
+
+def open_video_capture(video_path):
+    """
+    하드웨어 가속 디코딩(VAAPI/D3D11/VideoToolbox 등)으로 비디오 열기
+    
+    하드웨어 가속을 지원하지 않는 OpenCV 빌드이거나 열기에 실패하면 기본 방식으로 다시 연다.
+    
+    Args:
+        video_path (str): 비디오 파일 경로
+    
+    Returns:
+        cv2.VideoCapture: 비디오 캡처 객체
+    """
+    try:
+        video = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [
+            cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+            cv2.CAP_PROP_HW_DEVICE, 0,
+        ])
+        if video.isOpened():
+            return video
+        video.release()
+    except (AttributeError, TypeError, cv2.error):
+        # OpenCV 4.5.2 미만에는 하드웨어 가속 속성이 없음
+        pass
+    return cv2.VideoCapture(video_path)
+
+def save_frame(frame, frame_path):
+    """
+    프레임을 JPEG 파일로 저장 (최대 3회 시도)
+    
+    Args:
+        frame (numpy.ndarray): 저장할 BGR 프레임
+        frame_path (str): 저장할 파일 경로
+    
+    Returns:
+        bool: 저장 성공 여부
+    """
+    attempt = 0
+    permission_denied = False
+    
+    def attempt_save():
+        nonlocal attempt, permission_denied
+        attempt += 1
+        try:
+            # BGR 프레임을 OpenCV로 바로 JPEG 인코딩하여 저장
+            # (cv2.imwrite는 Windows에서 한글 경로에 저장하지 못하므로 인코딩 후 직접 기록)
+            encoded, buffer = cv2.imencode('.jpg', frame, JPEG_ENCODE_PARAMS)
+            if encoded:
+                with open(frame_path, 'wb') as f:
+                    f.write(buffer)
+            
+            # 파일이 실제로 생성되었는지 확인
+            if os.path.exists(frame_path) and os.path.getsize(frame_path) > 0:
+                return True
+            print(f"  ⚠️ 이미지 저장 실패 (시도 {attempt}/3)")
+        except PermissionError:
+            print(f"  ❌ 이미지 저장 권한이 없습니다: {frame_path}")
+            permission_denied = True
+        except Exception as e:
+            print(f"  ❌ 이미지 저장 중 오류: {str(e)}")
+        return None
+    
+    # 권한 오류는 재시도해도 해결되지 않으므로 중단
+    return retry_until_success(attempt_save, attempts=3, delay=0.3,
+                               give_up=lambda: permission_denied) is True
+
 class VideoProcessor:
     def __init__(self, video_dir, output_dir):
         """
@@ -84,23 +207,25 @@ class VideoProcessor:
             return []
         
         # 비디오 파일 열기 시도 (최대 3번)
-        video = None
-        max_attempts = 3
-        for attempt in range(max_attempts):
+        open_attempt = 0
+        
+        def attempt_open():
+            nonlocal open_attempt
+            open_attempt += 1
             try:
-                video = cv2.VideoCapture(video_path)
-                if video.isOpened():
-                    break
-                else:
-                    print(f"  ⚠️ 비디오 파일 열기 실패 (시도 {attempt+1}/{max_attempts})")
-                    time.sleep(0.5)  # 재시도 전 잠시 대기
+                capture = open_video_capture(video_path)
+                if capture.isOpened():
+                    return capture
+                capture.release()
+                print(f"  ⚠️ 비디오 파일 열기 실패 (시도 {open_attempt}/3)")
             except Exception as e:
                 print(f"  ❌ 비디오 파일 열기 중 오류: {str(e)}")
-                if attempt < max_attempts - 1:
-                    time.sleep(0.5)  # 재시도 전 잠시 대기
+            return None
+        
+        video = retry_until_success(attempt_open, attempts=3, delay=0.5)
         
         # 모든 시도 후에도 열지 못한 경우
-        if video is None or not video.isOpened():
+        if video is None:
             print(f"  ❌ {video_path} 파일을 열 수 없습니다.")
             return []
         
@@ -117,13 +242,21 @@ class VideoProcessor:
                 
             duration = frame_count / fps
             
-            frame_paths = []
+            # (입력 순서, 시간, 저장 경로, 저장 작업 Future) 리스트
+            pending_saves = []
+            
+            # 현재 디코더 위치 (다음에 읽힐 프레임 번호, 알 수 없으면 -1)
+            next_frame = 0
             
             # 비디오 파일명에서 날짜 정보 추출 (예: 20250101_123030.mp4 -> 20250101_123030)
             base_name = os.path.splitext(video_file)[0]
             
+            # 디코더가 앞으로만 이동하도록 시간 오름차순으로 추출하고, 결과는 입력 순서대로 반환
+            order = sorted(range(len(frame_times)), key=frame_times.__getitem__)
+            
             # 각 지정된 시간에 대해 프레임 추출
-            for time_sec in frame_times:
+            for index in order:
+                time_sec = frame_times[index]
                 if time_sec > duration:
                     print(f"  ⚠️ {time_sec}초는 비디오 길이({duration:.2f}초)보다 깁니다. 이 프레임은 건너뜁니다.")
                     continue
@@ -135,38 +268,32 @@ class VideoProcessor:
                     print(f"  ⚠️ 프레임 번호({frame_number})가 총 프레임 수({frame_count})보다 큽니다. 이 프레임은 건너뜁니다.")
                     continue
                 
+                # 가까운 앞쪽 프레임이면 grab()으로 순차 이동 (한 번의 디코딩 흐름 유지)
+                skip = frame_number - next_frame
+                seek_success = 0 <= skip <= MAX_SEQUENTIAL_GRAB and all(video.grab() for _ in range(skip))
+                
                 # 비디오 위치 설정 재시도 (최대 3회)
-                seek_success = False
-                for _ in range(3):
-                    try:
-                        if video.set(cv2.CAP_PROP_POS_FRAMES, frame_number):
-                            seek_success = True
-                            break
-                        else:
-                            time.sleep(0.1)  # 잠시 대기 후 재시도
-                    except Exception:
-                        time.sleep(0.1)  # 오류 시 잠시 대기
+                if not seek_success:
+                    seek_success = retry_until_success(lambda: seek_to_frame(video, frame_number))
                 
                 if not seek_success:
                     print(f"  ❌ {time_sec}초 위치로 이동할 수 없습니다.")
+                    next_frame = -1
                     continue
                 
-                # 프레임 읽기 시도 (최대 3회)
-                success = False
-                frame = None
-                for _ in range(3):
-                    try:
-                        success, frame = video.read()
-                        if success and frame is not None:
-                            break
-                        else:
-                            time.sleep(0.1)  # 잠시 대기 후 재시도
-                    except Exception:
-                        time.sleep(0.1)  # 오류 시 잠시 대기
+                # 프레임 읽기 시도 (최대 3회, 스트림 끝에 도달한 경우 재시도하지 않음)
+                frame = retry_until_success(
+                    lambda: read_frame(video),
+                    give_up=lambda: video.get(cv2.CAP_PROP_POS_FRAMES) >= frame_count
+                )
+                
+                # 읽기에 성공하면 디코더는 바로 다음 프레임에 위치
+                next_frame = frame_number + 1 if frame is not None else -1
                 
-                if success and frame is not None:
+                if frame is not None:
                     # 빈 프레임인지 확인 (흑백 또는 완전히 비어있는 프레임)
-                    if frame.size == 0 or np.mean(frame) < 5:  # 평균 픽셀 값이 5 미만이면 거의 검은색
+                    # 전체 픽셀 대신 일정 간격으로 샘플링한 픽셀의 평균만 계산 (복사 없는 view)
+                    if frame.size == 0 or frame[::BLACK_FRAME_SAMPLE_STRIDE, ::BLACK_FRAME_SAMPLE_STRIDE].mean() < 5:  # 평균 픽셀 값이 5 미만이면 거의 검은색
                         print(f"  ⚠️ {time_sec}초 위치의 프레임이 비어 있거나 검은색입니다.")
                         continue
                     
@@ -174,39 +301,25 @@ class VideoProcessor:
                     frame_filename = f"{base_name}_{time_sec}sec.jpg"
                     frame_path = os.path.abspath(os.path.join(self.output_dir, frame_filename))
                     
-                    # 파일 저장 시도 (최대 3회)
-                    saved = False
-                    for attempt in range(3):
-                        try:
-                            # PIL을 사용하여 이미지 저장
-                            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                            img = Image.fromarray(frame_rgb)
-                            img.save(frame_path)
-                            
-                            # 파일이 실제로 생성되었는지 확인
-                            if os.path.exists(frame_path) and os.path.getsize(frame_path) > 0:
-                                frame_paths.append(frame_path)
-                                saved = True
-                                break
-                            else:
-                                print(f"  ⚠️ 이미지 저장 실패 (시도 {attempt+1}/3)")
-                                time.sleep(0.3)  # 잠시 대기 후 재시도
-                        except PermissionError:
-                            print(f"  ❌ 이미지 저장 권한이 없습니다: {frame_path}")
-                            break  # 권한 오류는 재시도해도 해결되지 않으므로 중단
-                        except Exception as e:
-                            print(f"  ❌ 이미지 저장 중 오류: {str(e)}")
-                            if attempt < 2:  # 마지막 시도가 아니면 재시도
-                                time.sleep(0.3)
-                    
-                    if not saved:
-                        print(f"  ❌ {time_sec}초 프레임 저장에 모든 시도가 실패했습니다.")
+                    # JPEG 인코딩과 파일 기록은 GIL을 놓으므로 스레드에서 처리하고 다음 프레임 디코딩을 계속 진행
+                    # (호출한 쪽의 컨텍스트에서 실행하여 저장 중 출력도 같은 비디오의 출력으로 모이도록 함)
+                    future = get_save_executor().submit(contextvars.copy_context().run, save_frame, frame, frame_path)
+                    pending_saves.append((index, time_sec, frame_path, future))
                 else:
                     print(f"  ❌ {video_path}에서 {time_sec}초 프레임을 추출할 수 없습니다.")
             
             # 비디오 파일 닫기
             video.release()
             
+            # 저장 작업 완료를 기다리며 요청한 시간 순서대로 결과 수집
+            pending_saves.sort(key=lambda item: item[0])
+            frame_paths = []
+            for _, time_sec, frame_path, future in pending_saves:
+                if future.result():
+                    frame_paths.append(frame_path)
+                else:
+                    print(f"  ❌ {time_sec}초 프레임 저장에 모든 시도가 실패했습니다.")
+            
             return frame_paths
             
         except Exception as e:
@@ -238,8 +351,7 @@ class VideoProcessor:
                 return None
                 
             # 파일명에 유효하지 않은 문자가 있는지 확인
-            invalid_chars = ['\\', '/', ':', '*', '?', '"', '<', '>', '|']
-            if any(char in new_name for char in invalid_chars):
+            if INVALID_FILENAME_PATTERN.search(new_name):
                 print(f"  ❌ 새 파일명에 유효하지 않은 문자가 포함되어 있습니다: {new_name}")
                 return None
             